@@ -1,3 +1,3 @@
 from core import init
 
-app = init.init_application()
+app = init.init_application(required_stages=init.COLD_START_STAGES_LIST)
@@ -1,6 +1,15 @@
-import boto3
+import threading
+import time
+
 import flask
 
+from core import configuration
+from core.aws.clients import get_client
+
+_caller_identity = None
+_caller_user_id_override = None
+_caller_identity_lock = threading.Lock()
+
 
 def get_current_user_id():
     """
@@ -11,8 +20,66 @@ def get_current_user_id():
     # Check for flask identity to use instead of lambda user id
     if not flask.has_request_context() or 'identity' not in flask.g or flask.g.identity is None:
         # Return lambda user id
-        client = boto3.client('sts')
-        return client.get_caller_identity()['UserId']
+        return get_caller_user_id()
 
     # Return flask user identity
     return flask.g.identity.id if flask.g.identity.id else 'local-user'
+
+
+def get_caller_user_id():
+    """
+    Returns the user id of the identity the function runs as
+
+    The identity is resolved with STS on first use and cached (see get_caller_identity_ttl), so the writes of the
+    scripts and workers do not each send a request to STS
+    """
+    global _caller_identity
+
+    if _caller_user_id_override is not None:
+        return _caller_user_id_override
+
+    identity = _caller_identity
+    if identity is None or is_expired(identity):
+        with _caller_identity_lock:
+            identity = _caller_identity
+            if identity is None or is_expired(identity):
+                user_id = get_client('sts').get_caller_identity()['UserId']
+                ttl = get_caller_identity_ttl()
+                expires_at = None if ttl is None else time.monotonic() + ttl
+                identity = _caller_identity = (user_id, expires_at)
+
+    return identity[0]
+
+
+def get_caller_identity_ttl():
+    """
+    Returns the seconds the identity the function runs as is kept before being resolved again (the
+    CALLER_IDENTITY_TTL setting), None to keep it for the lifetime of the container
+    """
+    ttl = configuration.get_setting('CALLER_IDENTITY_TTL', default=None)
+    return None if ttl is None else float(ttl)
+
+
+def is_expired(identity):
+    _, expires_at = identity
+    return expires_at is not None and expires_at <= time.monotonic()
+
+
+def set_caller_user_id(user_id):
+    """
+    Override the user id of the identity the function runs as, for the batch tools recording their writes under a
+    name of their own without resolving their identity
+    :param user_id: The user id, None to remove the override
+    """
+    global _caller_user_id_override
+    _caller_user_id_override = user_id
+
+
+def clear_caller_identity():
+    """
+    Drop the cached identity, it is resolved again on next use (as when the credentials change)
+    """
+    global _caller_identity
+
+    with _caller_identity_lock:
+        _caller_identity = None
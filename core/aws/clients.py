@@ -0,0 +1,83 @@
+import threading
+
+from botocore.config import Config
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Connections kept open per client, enough for the threads of the shared pool and of the outbox worker to send
+# their requests at the same time
+MAX_POOL_CONNECTIONS = 25
+
+# Timeouts in seconds, short enough for a stalled connection to be retried within the timeout of the functions
+CONNECT_TIMEOUT = 2
+READ_TIMEOUT = 5
+MAX_ATTEMPTS = 3
+
+# Options of the newer botocore versions, set when the installed version supports them
+NEWER_CONFIG_OPTIONS = {'tcp_keepalive': True}
+RETRY_MODE = 'adaptive'
+
+_session = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client_config():
+    options = {
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'connect_timeout': CONNECT_TIMEOUT,
+        'read_timeout': READ_TIMEOUT,
+        'retries': {'max_attempts': MAX_ATTEMPTS},
+    }
+
+    # The retry modes came with the same versions as the keep-alive option
+    supported_options = {name: value for name, value in NEWER_CONFIG_OPTIONS.items()
+                         if name in Config.OPTION_DEFAULTS}
+    if supported_options:
+        options.update(supported_options)
+        options['retries']['mode'] = RETRY_MODE
+
+    return Config(**options)
+
+
+def get_client(service_name, region_name=None):
+    """
+    Returns the client of an AWS service, created on first use and kept for the later invocations of the container
+
+    The clients are created from a session of their own, the default session of boto3 being unsafe to create
+    clients from several threads. The clients themselves can be shared by the threads.
+    :param service_name: The name of the service (ses, sts, cognito-idp, etc.)
+    :param region_name: The region of the service, the region of the function if not set
+    :return: The client
+    """
+    key = (service_name, region_name)
+    client = _clients.get(key)
+
+    if client is None:
+        global _session
+
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                if _session is None:
+                    # Imported on first use, the functions creating no client start without it
+                    import boto3
+                    _session = boto3.session.Session()
+
+                logger.debug("Init '%s' client", service_name)
+                client = _session.client(service_name, region_name=region_name, config=get_client_config())
+                _clients[key] = client
+
+    return client
+
+
+def clear_clients():
+    """
+    Drop the clients created, the next ones being created from a new session (as when the credentials change)
+    """
+    global _session
+
+    with _clients_lock:
+        _clients.clear()
+        _session = None
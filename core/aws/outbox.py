@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from core import errors
+from core.aws.ses import SES
+from core.db.emails import get_due_emails, remove_sent_emails, reschedule_email, save_email
+from core.db.model import get_time_now
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Number of due emails read at a time, and the number of them sent at the same time
+OUTBOX_BATCH_SIZE = 25
+OUTBOX_WORKERS = 5
+
+# Number of attempts to send an email before giving up, and the delay before the second one (doubled after each
+# failed attempt)
+MAX_SEND_ATTEMPTS = 5
+RETRY_DELAY = timedelta(minutes=1)
+
+# Time left to the worker when it stops reading due emails, to finish the batch it is sending
+TIME_MARGIN_MILLIS = 15000
+
+
+def send_email_later(recipients, subject, body):
+    """
+    Queue an email in the outbox instead of sending it during the request, it is sent by the outbox worker
+    (see handlers/email_outbox.py) which retries it on failure
+    """
+    return save_email(recipients, subject, body)
+
+
+def drain_outbox(get_remaining_time_in_millis=None):
+    """
+    Send the due emails of the outbox, batch by batch until there is none left or the time is running out
+    :param get_remaining_time_in_millis: If set, the function returning the time left to the worker
+    :return: The number of emails sent, attempted again later and given up
+    """
+    ses = SES()
+    counts = {'sent': 0, 'retried': 0, 'failed': 0}
+    attempted_ids = set()
+
+    while get_remaining_time_in_millis is None or get_remaining_time_in_millis() > TIME_MARGIN_MILLIS:
+        # The emails already attempted are skipped, like the sent ones which could not be removed
+        emails = [email for email in get_due_emails(get_time_now(), OUTBOX_BATCH_SIZE)
+                  if email.id not in attempted_ids]
+        if not emails:
+            break
+
+        attempted_ids.update(email.id for email in emails)
+        with ThreadPoolExecutor(max_workers=OUTBOX_WORKERS) as executor:
+            send_errors = list(executor.map(lambda email: send_email(ses, email), emails))
+
+        sent_emails = [email for email, error in zip(emails, send_errors) if error is None]
+        if remove_sent_emails(sent_emails):
+            logger.error('Unable to remove sent emails from the outbox, they will be sent again')
+        counts['sent'] += len(sent_emails)
+
+        for email, error in zip(emails, send_errors):
+            if error is not None:
+                counts[retry_email(email, error)] += 1
+
+    logger.info('Outbox drained: %(sent)s sent, %(retried)s retried, %(failed)s failed', counts)
+    return counts
+
+
+def send_email(ses, email):
+    """
+    Send an email of the outbox, returning the error message if it could not be sent
+    """
+    try:
+        ses.send_email(recipients=email.recipients, subject=email.subject, body=email.body)
+    except errors.SESError as e:
+        return str(e.__cause__ or e.__context__ or e.message)
+
+    return None
+
+
+def retry_email(email, error):
+    if email.attempts + 1 >= MAX_SEND_ATTEMPTS:
+        logger.error('Giving up sending email %s after %s attempts: %s', email.id, email.attempts + 1, error)
+        reschedule_email(email, error)
+        return 'failed'
+
+    reschedule_email(email, error, get_time_now() + RETRY_DELAY * 2 ** email.attempts)
+    return 'retried'
@@ -1,5 +1,4 @@
 import base64
-import boto3
 import email.utils
 
 from email.mime.multipart import MIMEMultipart
@@ -7,6 +6,7 @@ from email.mime.application import MIMEApplication
 
 from core import errors
 from core import configuration
+from core.aws.clients import get_client
 
 import logging
 logger = logging.getLogger(__name__)
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 class SES:
     def __init__(self):
         # TODO: Remove region restriction when Cognito supported in Canadian region
-        self.client = boto3.client('ses', region_name='us-east-1')
+        self.client = get_client('ses', region_name='us-east-1')
         hosted_zone_name = configuration.get_setting('hosted_zone_name')
         if hosted_zone_name[-1] == '.':
             hosted_zone_name = hosted_zone_name[:-1]
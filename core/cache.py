@@ -0,0 +1,128 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_SIZE = 256
+
+# Returned by the backends when a key is not cached, as None is a valid cached value
+MISSING = object()
+
+
+class MemoryBackend:
+    """
+    In-process LRU store whose entries expire after their time to live
+
+    A backend implements get, set, incr, get_counter and __len__. A store shared by the local processes can be used
+    instead by passing an object implementing the same methods to the Cache.
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, clock=time.monotonic):
+        self.max_size = max_size
+        self.evictions = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def incr(self, key):
+        # Counters are kept apart from the entries so they are never evicted or expired
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class Cache:
+    """
+    Read-through cache whose entries are invalidated by bumping the generation of their namespace
+
+    The generation of the namespace is part of the key of an entry, so after a bump the entries of the previous
+    generation are no longer read and age out of the backend.
+    """
+    def __init__(self, name, ttl=DEFAULT_TTL, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def get_generation(self, namespace):
+        return self.backend.get_counter((self.name, namespace))
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.incr((self.name, namespace))
+
+    def get_or_set(self, namespace, key, load):
+        """
+        Returns the cached value of the key, loading and caching it on a miss
+        :param namespace: The namespace of the key, invalidated as a whole
+        :param key: The key of the value within the namespace
+        :param load: Function returning the value to be cached
+        :return: The cached or loaded value
+        """
+        cache_key = (self.name, namespace, self.get_generation(namespace), key)
+
+        value = self.backend.get(cache_key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = load()
+        self.backend.set(cache_key, value, self.ttl)
+
+        return value
+
+    def get_metrics(self):
+        lookups = self.hits + self.misses
+
+        return {
+            'name': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': getattr(self.backend, 'evictions', None),
+            'size': len(self.backend),
+        }
+
+    def log_metrics(self):
+        logger.debug('Cache %(name)s: %(hits)s hits, %(misses)s misses, %(evictions)s evictions, %(size)s entries',
+                     self.get_metrics())
@@ -1,41 +1,121 @@
 # Standard imports
+import glob
+import hashlib
+import json
 import os
 
-# Third party imports
-import yaml
-
 # Local imports
 from core import utils
 
-settings = {}
+# Directory of the configs compiled at build time (see compile_config), next to the YAML configs
+COMPILED_CONFIG_DIR_NAME = 'compiled'
+
+# Environment variables merged into the settings, on top of the variables named as the settings of the config file
+ENVIRONMENT_SETTING_NAMES = ('SERVICE_NAME', 'STAGE', 'UI_DOMAIN_NAME', 'CALLER_IDENTITY_TTL')
+
+# Read-only snapshot of the settings, replaced as a whole when they change
+settings = utils.freeze({})
+
+# Default of the settings which must be specified (see get_setting)
+REQUIRED = object()
 
 
 def init_settings():
     """
     * Read the environment config
-    * Merge environment variables in (overwriting environment config)
+    * Merge the environment variables of the settings in (overwriting environment config)
+    * Freeze the settings
     """
+    global settings
+
+    new_settings = utils.thaw(settings)
     config_file = 'configs/%s.yaml' % os.environ['STAGE']
 
     if os.path.exists(config_file):
-        with open(config_file) as f:
-            utils.deep_merge(yaml.load(f, Loader=yaml.FullLoader), settings)
+        utils.deep_merge(load_config(config_file), new_settings)
     else:
         print("File doesn't exist: %s" % config_file)
 
-    # Deep merge any environment variables
-    utils.deep_merge(os.environ, settings)
+    # Merge the environment variables of the settings only, not the whole environment
+    utils.deep_merge(get_environment_settings(new_settings), new_settings)
+
+    settings = utils.freeze(new_settings)
+
+
+def get_environment_settings(config_settings):
+    names = set(ENVIRONMENT_SETTING_NAMES).union(config_settings)
+    return {name: os.environ[name] for name in names if name in os.environ}
+
+
+def load_config(config_file):
+    """
+    Returns the settings of a config file, read from its compiled config when it was compiled from the current
+    contents of the file instead of parsing the YAML
+    """
+    with open(config_file, 'rb') as f:
+        source = f.read()
+
+    compiled_file = get_compiled_config_file(config_file)
+    if os.path.exists(compiled_file):
+        with open(compiled_file) as f:
+            compiled = json.load(f)
+
+        if compiled.get('source_hash') == get_source_hash(source):
+            return compiled['settings']
+
+    return parse_config(source)
+
 
+def parse_config(source):
+    # Imported only when a config is parsed, the deployed functions read the compiled configs
+    import yaml
 
-def get_setting(name):
+    return yaml.load(source, Loader=yaml.FullLoader)
+
+
+def compile_config(config_file):
+    """
+    Write the settings of a config file as JSON, with the hash of the file they were parsed from
+    :param config_file: The path of the YAML config file
+    :return: The path of the compiled config
+    """
+    with open(config_file, 'rb') as f:
+        source = f.read()
+
+    compiled_file = get_compiled_config_file(config_file)
+    os.makedirs(os.path.dirname(compiled_file), exist_ok=True)
+    with open(compiled_file, 'w') as f:
+        json.dump({'source_hash': get_source_hash(source), 'settings': parse_config(source)}, f)
+
+    return compiled_file
+
+
+def compile_configs(config_dir='configs'):
+    return [compile_config(config_file) for config_file in sorted(glob.glob(os.path.join(config_dir, '*.yaml')))]
+
+
+def get_compiled_config_file(config_file):
+    name, _ = os.path.splitext(os.path.basename(config_file))
+    return os.path.join(os.path.dirname(config_file), COMPILED_CONFIG_DIR_NAME, name + '.json')
+
+
+def get_source_hash(source):
+    return hashlib.sha1(source).hexdigest()
+
+
+def get_setting(name, default=REQUIRED):
     if name not in settings:
+        if default is not REQUIRED:
+            return default
+
         raise Exception("Required setting '{}' was not specified".format(name))
 
     return settings[name]
 
 
 def set_setting(name, value):
-    settings[name] = value
+    global settings
+    settings = utils.freeze(dict(settings, **{name: value}))
 
 
 def get_region_name():
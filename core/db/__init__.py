@@ -1,8 +1,20 @@
+import base64
+import binascii
+import json
+import queue
+import threading
+import time
 import uuid
 
+from concurrent.futures import ThreadPoolExecutor
 from pynamodb import indexes
 from pynamodb.exceptions import PutError
-from core.db.events.model import EventModel
+from pynamodb.pagination import ResultIterator
+from core import errors
+from core.auth import get_current_user_id
+from core.db.model import BaseModel, get_time_now
+from core.db.emails.model import EmailModel
+from core.db.events.model import EventBucketModel, EventCategoryModel, EventModel
 from core.db.organizations.model import OrganizationModel
 from core.db.users.model import UserModel
 
@@ -10,7 +22,29 @@ import logging
 logger = logging.getLogger(__name__)
 
 # List for all PynamoDB models (both index and tables)
-MODELS = [EventModel, OrganizationModel, UserModel]
+MODELS = [EmailModel, EventModel, EventBucketModel, EventCategoryModel, OrganizationModel, UserModel]
+
+# Default number of segments a table is divided into for a parallel scan
+DEFAULT_SCAN_SEGMENTS = 4
+
+# Marks the end of a segment in the parallel scan results
+_SEGMENT_DONE = object()
+
+# Number of threads of the pool shared by the concurrent reads (see submit)
+SHARED_POOL_WORKERS = 8
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+# Maximum number of items written by a BatchWriteItem request
+BATCH_WRITE_SIZE = 25
+
+# Default number of BatchWriteItem requests sent at the same time
+DEFAULT_BATCH_WRITE_WORKERS = 4
+
+# Number of times the unprocessed items of a batch are written again, waiting twice as long each time
+BATCH_WRITE_RETRIES = 5
+BATCH_WRITE_RETRY_DELAY = 0.05
 
 
 def init_models(service_name, stage):
@@ -24,6 +58,32 @@ def init_models(service_name, stage):
         logger.debug("Init %s model '%s'", entity_type, model.Meta.index_name)
 
 
+def get_shared_pool():
+    """
+    Returns the thread pool shared by the concurrent reads, created on first use and kept for the later requests
+    """
+    global _shared_pool
+
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(max_workers=SHARED_POOL_WORKERS, thread_name_prefix='db')
+
+        return _shared_pool
+
+
+def submit(function, *args, **kwargs):
+    """
+    Run a function on the shared thread pool, so independent reads are sent at the same time instead of one after
+    the other
+
+    The function runs outside of the request context, it is meant for reads which do not depend on it (the writes
+    set their audit attributes from the current user)
+    :param function: The function to run
+    :return: The future of its result, whose result method raises the exception raised by the function
+    """
+    return get_shared_pool().submit(function, *args, **kwargs)
+
+
 def get_filter_condition(conditions):
     filter_condition = None
 
@@ -36,6 +96,144 @@ def get_filter_condition(conditions):
     return filter_condition
 
 
+def get_projection(model, schema, *attribute_names):
+    """
+    Returns the attributes of a model to read for the items dumped by a schema
+
+    Items read with a projection only have the projected attributes set, they are not meant to be saved
+    :param model: The model of the items
+    :param schema: The schema dumping the items
+    :param attribute_names: The other attributes needed to handle the items
+    :return: The names of the attributes in the table
+    """
+    attributes = model.get_attributes()
+
+    names = {field.attribute or name for name, field in schema.fields.items() if not field.load_only}
+    names.update(attribute_names)
+    names.update(name for name, attribute in attributes.items() if attribute.is_hash_key or attribute.is_range_key)
+
+    return sorted(attributes[name].attr_name for name in names if name in attributes)
+
+
+def scan(model, filter_condition=None, attributes_to_get=None, segment=None, total_segments=None, limit=None,
+         last_evaluated_key=None):
+    """
+    Scan a table like model.scan, reading only the attributes_to_get when set (model.scan does not support
+    projections in this version of pynamodb)
+    """
+    scan_kwargs = dict(
+        filter_condition=filter_condition,
+        attributes_to_get=attributes_to_get,
+        exclusive_start_key=last_evaluated_key,
+        segment=segment,
+        total_segments=total_segments,
+        limit=limit,
+    )
+
+    return ResultIterator(model._get_connection().scan, (), scan_kwargs, map_fn=model.from_raw_data, limit=limit)
+
+
+def parallel_scan(model, filter_condition=None, total_segments=DEFAULT_SCAN_SEGMENTS, max_workers=None,
+                  attributes_to_get=None):
+    """
+    Scan a table as several segments read concurrently, yielding the items of all segments as they arrive
+    :param model: The model of the table to scan
+    :param filter_condition: Condition used to restrict the scan results
+    :param total_segments: The number of segments the table is divided into
+    :param max_workers: The maximum number of segments scanned at the same time (defaults to all of them)
+    :param attributes_to_get: If set, only these attributes are read (see get_projection)
+    :return: Iterator of the scanned items
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def scan_segment(segment):
+        try:
+            if stop.is_set():
+                return
+
+            for item in scan(model, filter_condition, attributes_to_get, segment=segment,
+                             total_segments=total_segments):
+                if stop.is_set():
+                    return
+                results.put(item)
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(_SEGMENT_DONE)
+
+    with ThreadPoolExecutor(max_workers=max_workers or total_segments) as executor:
+        for segment in range(total_segments):
+            executor.submit(scan_segment, segment)
+
+        try:
+            remaining_segments = total_segments
+            while remaining_segments:
+                result = results.get()
+                if result is _SEGMENT_DONE:
+                    remaining_segments -= 1
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    yield result
+        finally:
+            # Stop the segments still running when the results are not all consumed
+            stop.set()
+
+
+def scan_page(model, filter_condition, limit, cursor=None, attributes_to_get=None):
+    """
+    Scan one page of a table
+    :param model: The model of the table to scan
+    :param filter_condition: Condition used to restrict the scan results
+    :param limit: The maximum number of items in the page
+    :param cursor: The cursor of the page, the first page is scanned if not set
+    :param attributes_to_get: If set, only these attributes are read (see get_projection)
+    :return: The items of the page and the cursor of the next page (None on the last page)
+    """
+    position = decode_cursor(cursor)
+    results = scan(model, filter_condition, attributes_to_get, limit=limit, last_evaluated_key=position.get('key'))
+    return get_page(results)
+
+
+def get_page(results, **position):
+    """
+    Read the items of a limited query or scan
+    :param results: The result iterator of the query or scan
+    :param position: The other values stored in the cursor of the next page, with the last evaluated key
+    :return: The items read and the cursor of the next page (None on the last page)
+    """
+    items = list(results)
+    last_evaluated_key = results.last_evaluated_key
+
+    return items, encode_cursor(dict(position, key=last_evaluated_key)) if last_evaluated_key else None
+
+
+def encode_cursor(position):
+    """
+    Encode the position of a page as an opaque cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor, an empty position is returned when the cursor is not set
+    """
+    if not cursor:
+        return {}
+
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        position = None
+
+    if not isinstance(position, dict):
+        raise errors.BadRequestError(messages={'cursor': ['Invalid cursor']})
+
+    return position
+
+
 def update_item(item, actions):
     if actions:
         item.update(actions=actions)
@@ -53,6 +251,97 @@ def save_with_unique_id(item):
     return save_item(item)
 
 
+def batch_save(model, items, max_workers=DEFAULT_BATCH_WRITE_WORKERS):
+    """
+    Save items with BatchWriteItem requests of at most 25 items sent concurrently, retrying the unprocessed items
+
+    The audit attributes of the items are set as by save
+    :param model: The model of the items
+    :param items: The items to be saved
+    :param max_workers: The maximum number of requests sent at the same time
+    :return: The list of the items which could not be saved
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    if issubclass(model, BaseModel):
+        timestamp, current_user = get_time_now(), get_current_user_id()
+        for item in items:
+            item.set_audit_attributes(timestamp, current_user)
+
+    return write_batches(model, items, max_workers)
+
+
+def batch_delete(model, items, max_workers=DEFAULT_BATCH_WRITE_WORKERS):
+    """
+    Delete items with BatchWriteItem requests of at most 25 items sent concurrently, retrying the unprocessed items
+    :param model: The model of the items
+    :param items: The items to be deleted, only their keys are needed
+    :param max_workers: The maximum number of requests sent at the same time
+    :return: The list of the items which could not be deleted
+    """
+    return write_batches(model, list(items), max_workers, delete=True)
+
+
+def write_batches(model, items, max_workers, delete=False):
+    if not items:
+        return []
+
+    batches = [items[index:index + BATCH_WRITE_SIZE] for index in range(0, len(items), BATCH_WRITE_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        unwritten_batches = list(executor.map(lambda batch: write_batch(model, batch, delete), batches))
+
+    return [item for unwritten_items in unwritten_batches for item in unwritten_items]
+
+
+def write_batch(model, items, delete=False):
+    """
+    Save or delete at most 25 items with a BatchWriteItem request, writing the unprocessed items again until they
+    are all written or the retries are exhausted
+    :return: The list of the items which could not be written
+    """
+    connection = model._get_connection()
+    key_names = [attribute.attr_name for attribute in (model._hash_key_attribute(), model._range_key_attribute())
+                 if attribute is not None]
+    request_type, request_key = ('DeleteRequest', 'Key') if delete else ('PutRequest', 'Item')
+
+    def get_key(attribute_values):
+        # The keys of the deleted items are sent as plain values, the other attributes with their types
+        values = (attribute_values[name] for name in key_names)
+        return tuple(json.dumps(next(iter(value.values())) if isinstance(value, dict) else value) for value in values)
+
+    pending = {}
+    for item in items:
+        attribute_values = item._get_keys() if delete else item._serialize(attr_map=True)['attributes']
+        pending[get_key(attribute_values)] = (item, attribute_values)
+
+    for retry in range(BATCH_WRITE_RETRIES + 1):
+        if retry:
+            time.sleep(BATCH_WRITE_RETRY_DELAY * 2 ** (retry - 1))
+
+        requests = [attribute_values for _, attribute_values in pending.values()]
+        try:
+            if delete:
+                data = connection.batch_write_item(delete_items=requests)
+            else:
+                data = connection.batch_write_item(put_items=requests)
+        except PutError as e:
+            logger.error('Unable to write the items {}'.format(str(e)))
+            break
+
+        unprocessed = (data or {}).get('UnprocessedItems', {}).get(model.Meta.table_name, [])
+        unprocessed_keys = {get_key(request[request_type][request_key]) for request in unprocessed}
+        pending = {key: value for key, value in pending.items() if key in unprocessed_keys}
+        if not pending:
+            break
+
+    if pending:
+        logger.error('Unable to write %s items in table %s', len(pending), model.Meta.table_name)
+
+    return [item for item, _ in pending.values()]
+
+
 def save_item(item):
     """
     Save a record in the database
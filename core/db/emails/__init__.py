@@ -0,0 +1,42 @@
+from core import db
+from core.db.emails.model import EmailModel, FAILED, PENDING
+from core.db.model import get_time_now
+
+
+def save_email(recipients, subject, body):
+    """
+    Queue an email in the outbox, to be sent as soon as possible
+    """
+    email = EmailModel(recipients=list(recipients), subject=subject, body=body, next_attempt_at=get_time_now())
+    db.save_with_unique_id(email)
+
+    return email
+
+
+def get_due_emails(date, limit=None):
+    """
+    Returns the emails waiting to be sent whose next attempt is due at the date, the longest waiting first
+    """
+    return EmailModel.status_next_attempt_index.query(PENDING, EmailModel.next_attempt_at <= date, limit=limit)
+
+
+def remove_sent_emails(emails):
+    """
+    Delete sent emails from the outbox
+    :return: The list of the emails which could not be deleted
+    """
+    return db.batch_delete(EmailModel, emails)
+
+
+def reschedule_email(email, error, next_attempt_at=None):
+    """
+    Record a failed attempt to send an email, which is attempted again at next_attempt_at or given up if not set
+    """
+    actions = [EmailModel.attempts.set(email.attempts + 1), EmailModel.last_error.set(error)]
+
+    if next_attempt_at is None:
+        actions.append(EmailModel.status.set(FAILED))
+    else:
+        actions.append(EmailModel.next_attempt_at.set(next_attempt_at))
+
+    db.update_item(email, actions)
@@ -0,0 +1,36 @@
+from core.db.model import BaseModel
+from pynamodb.attributes import ListAttribute, NumberAttribute, UnicodeAttribute, UTCDateTimeAttribute
+from pynamodb.indexes import AllProjection, GlobalSecondaryIndex
+
+# Status of the emails waiting to be sent, and of the emails given up after their last attempt
+PENDING = 'pending'
+FAILED = 'failed'
+
+
+class StatusNextAttemptIndex(GlobalSecondaryIndex):
+    class Meta:
+        index_name = 'status-next_attempt_at-index'
+        projection = AllProjection()
+        read_capacity_units = 0
+        write_capacity_units = 0
+
+    status = UnicodeAttribute(hash_key=True)
+    next_attempt_at = UTCDateTimeAttribute(range_key=True)
+
+
+class EmailModel(BaseModel):
+    """
+    Email queued in the outbox, deleted once sent (see core.aws.outbox)
+    """
+    class Meta(BaseModel.Meta):
+        simple_name = 'email'
+
+    id = UnicodeAttribute(hash_key=True)
+    recipients = ListAttribute(default=lambda: [])
+    subject = UnicodeAttribute()
+    body = UnicodeAttribute()
+    status = UnicodeAttribute(default=PENDING)
+    attempts = NumberAttribute(default=0)
+    next_attempt_at = UTCDateTimeAttribute()
+    last_error = UnicodeAttribute(null=True)
+    status_next_attempt_index = StatusNextAttemptIndex()
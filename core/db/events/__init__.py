@@ -1,4 +1,4 @@
-from core import errors
+from core import db, errors
 from core.db.events.model import EventModel
 
 
@@ -10,12 +10,47 @@ def get_event_from_db(event_id, owner):
         raise errors.ResourceNotFoundError(messages={'event': [message]})
 
 
-def remove_event_from_db(event_id, owner):
-    event = get_event_from_db(event_id, owner)
+def get_events_by_keys(keys, attributes_to_get=None):
+    """
+    Returns the events of the (event id, owner) keys
+    """
+    return EventModel.batch_get(keys, attributes_to_get=attributes_to_get)
 
-    try:
-        # TODO: Soft delete vs hard delete?
-        event.delete()
-    except EventModel.DeleteError:
-        message = 'Unable to delete event {} for owner {}'.format(event_id, owner)
-        raise errors.BadRequestError(messages={'event': [message]})
+
+def get_events_by_owner(owner, start_date=None, end_date=None, category_filters=None, limit=None,
+                        last_evaluated_key=None, attributes_to_get=None):
+    """
+    Returns the events of an owner starting before the end of the date range and ending after its start
+    :param owner: The owner of the events
+    :param start_date: If set, only the events ending after this date are returned
+    :param end_date: If set, only the events starting before this date are returned
+    :param category_filters: If set, only the events with one of these categories are returned
+    :param limit: If set, the maximum number of events returned
+    :param last_evaluated_key: If set, the key the query resumes after
+    :param attributes_to_get: If set, only these attributes are read (see core.db.get_projection)
+    :return: Iterator of the matching events
+    """
+    range_key_condition = EventModel.start_date <= end_date if end_date is not None else None
+
+    conditions = []
+    if start_date is not None:
+        conditions.append(EventModel.end_date >= start_date)
+
+    if category_filters:
+        category_condition = None
+        for category in category_filters:
+            condition = EventModel.categories.contains(category)
+            category_condition = condition if category_condition is None else category_condition | condition
+
+        conditions.append(category_condition)
+
+    if attributes_to_get is not None:
+        # The index keys are read to resume the query after the last event of a page
+        attributes_to_get = sorted(set(attributes_to_get) | {'owner', 'start_date'})
+
+    return EventModel.owner_start_date_index.query(owner,
+                                                   range_key_condition,
+                                                   filter_condition=db.get_filter_condition(conditions),
+                                                   limit=limit,
+                                                   last_evaluated_key=last_evaluated_key,
+                                                   attributes_to_get=attributes_to_get)
@@ -1,8 +1,14 @@
+import functools
+
+from datetime import datetime
 from dateutil import parser
 
+from core.configuration import get_region_name
 from core.db.model import BaseModel
 from pynamodb.attributes import BooleanAttribute, ListAttribute, MapAttribute, NumberAttribute, UnicodeAttribute
 from pynamodb.constants import STRING
+from pynamodb.indexes import AllProjection, GlobalSecondaryIndex
+from pynamodb.models import Model
 from services.events import constants
 
 
@@ -28,6 +34,33 @@ class OccurrenceTypeEnumUnicodeAttribute(UnicodeAttribute):
             return UnicodeAttribute.serialize(self, value)
 
 
+# Number of parsed values kept by each of the date and time parsers
+PARSED_VALUES_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=PARSED_VALUES_CACHE_SIZE)
+def parse_date(value):
+    """
+    Parses a date stored with the event date format, dateutil parses the values stored with another format
+    """
+    try:
+        return datetime.strptime(value, constants.EVENT_DATE_FORMAT)
+    except ValueError:
+        return parser.parse(value)
+
+
+@functools.lru_cache(maxsize=PARSED_VALUES_CACHE_SIZE)
+def parse_time(value):
+    """
+    Parses a time stored with the event time format (on 1900-01-01, as the request schemas load it), dateutil
+    parses the values stored with another format
+    """
+    try:
+        return datetime.strptime(value, constants.EVENT_TIME_FORMAT)
+    except ValueError:
+        return parser.parse(value)
+
+
 class DateAttribute(UnicodeAttribute):
     """
     This class will serializer/deserialize any date Python object and store as a unicode attribute
@@ -38,7 +71,7 @@ class DateAttribute(UnicodeAttribute):
         return super(DateAttribute, self).serialize(value.strftime(constants.EVENT_DATE_FORMAT))
 
     def deserialize(self, value):
-        return parser.parse(value)
+        return parse_date(value)
 
 
 class TimeAttribute(UnicodeAttribute):
@@ -51,7 +84,18 @@ class TimeAttribute(UnicodeAttribute):
         return super(TimeAttribute, self).serialize(value.strftime(constants.EVENT_TIME_FORMAT))
 
     def deserialize(self, value):
-        return parser.parse(value)
+        return parse_time(value)
+
+
+class OwnerStartDateIndex(GlobalSecondaryIndex):
+    class Meta:
+        index_name = 'owner-start_date-index'
+        projection = AllProjection()
+        read_capacity_units = 0
+        write_capacity_units = 0
+
+    owner = UnicodeAttribute(hash_key=True)
+    start_date = DateAttribute(range_key=True)
 
 
 class RecurrenceDetails(MapAttribute):
@@ -89,4 +133,41 @@ class EventModel(BaseModel):
     is_recurring = BooleanAttribute(default=False)
     recurrence_details = RecurrenceDetails(null=True, default=lambda: [])
     occurrences = ListAttribute(of=OccurrenceDetail, default=lambda: [])
+    # Events with a recurrence rule only store the end date of their first occurrence, their occurrences are
+    # expanded from the rule on read (see services.events.occurrences.get_event_occurrences)
+    is_rule_based = BooleanAttribute(default=False)
+    first_end_date = DateAttribute(null=True)
     timezone = UnicodeAttribute(default='GMT')
+    owner_start_date_index = OwnerStartDateIndex()
+
+
+class EventBucketModel(Model):
+    """
+    Index of the weeks (buckets) an event has occurrences in, one entry per event and week
+    """
+    class Meta:
+        region = get_region_name()
+        simple_name = 'event-bucket'
+
+    bucket = UnicodeAttribute(hash_key=True)
+    event_id = UnicodeAttribute(range_key=True)
+    owner = UnicodeAttribute()
+    # First bucket the occurrences are not indexed in, set on the entries of the horizon bucket
+    indexed_until = UnicodeAttribute(null=True)
+
+
+class EventCategoryModel(Model):
+    """
+    Index of the weeks (buckets) an event has occurrences in by category, one entry per event, category and week
+    """
+    class Meta:
+        region = get_region_name()
+        simple_name = 'event-category'
+
+    category = UnicodeAttribute(hash_key=True)
+    bucket_event_id = UnicodeAttribute(range_key=True)
+    bucket = UnicodeAttribute()
+    event_id = UnicodeAttribute()
+    owner = UnicodeAttribute()
+    # First bucket the occurrences are not indexed in, set on the entries of the horizon bucket
+    indexed_until = UnicodeAttribute(null=True)
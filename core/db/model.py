@@ -14,12 +14,50 @@ def get_time_now():
     return datetime.utcnow()
 
 
+# Values returned as they are by to_primitive
+PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+_PRIMITIVE_TYPES = frozenset(PRIMITIVE_TYPES)
+
+
+def to_primitive(value):
+    """
+    Converts a value holding models and attribute containers to the dicts, lists and primitives JSON encodes it to
+    :param value: The value to be converted
+    :return: The converted value, models and maps are converted to dicts and dates to ISO 8601 strings
+    """
+    value_type = type(value)
+
+    if value_type in _PRIMITIVE_TYPES:
+        return value
+    if value_type is datetime:
+        return value.isoformat()
+
+    # The primitive items are checked in place, converting a model is mostly converting its leaf values
+    attribute_values = getattr(value, 'attribute_values', None)
+    if attribute_values is not None:
+        return {key: item if type(item) in _PRIMITIVE_TYPES else to_primitive(item)
+                for key, item in attribute_values.items()}
+    if isinstance(value, dict):
+        return {str(key): item if type(item) in _PRIMITIVE_TYPES else to_primitive(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [item if type(item) in _PRIMITIVE_TYPES else to_primitive(item) for item in value]
+    if isinstance(value, PRIMITIVE_TYPES):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    raise TypeError('Object of type {} is not JSON serializable'.format(value_type.__name__))
+
+
 class ModelEncoder(json.JSONEncoder):
     def default(self, obj):
         if hasattr(obj, 'attribute_values'):
             return obj.attribute_values
-        elif isinstance(obj, datetime.datetime):
+        elif isinstance(obj, datetime):
             return obj.isoformat()
+        elif isinstance(obj, (set, frozenset)):
+            return list(obj)
         return json.JSONEncoder.default(self, obj)
 
 
@@ -34,9 +72,14 @@ class BaseModel(Model):
     updated_by = UnicodeAttribute()
 
     def save(self, conditional_operator=None, **expected_values):
-        timestamp = get_time_now()
-        current_user = get_current_user_id()
+        self.set_audit_attributes(get_time_now(), get_current_user_id())
+
+        return Model.save(self, conditional_operator, **expected_values)
 
+    def set_audit_attributes(self, timestamp, current_user):
+        """
+        Sets the created and updated attributes of an item being saved, also used for the items saved in batches
+        """
         if self.created_at is None or self.created_by is None:
             logger.debug('First time save of entity; setting created_at and created_by', extra={
                 'CreatedAt': timestamp,
@@ -49,14 +92,17 @@ class BaseModel(Model):
         self.updated_at = timestamp
         self.updated_by = current_user
 
-        return Model.save(self, conditional_operator, **expected_values)
-
     def update(self, attributes=None, actions=None, condition=None, conditional_operator=None, **expected_values):
         # Set the updated_at and updated_by values
         self.updated_at = get_time_now()
         self.updated_by = get_current_user_id()
 
+        # The update actions only write the listed attributes, the audit attributes are added to them
+        if actions is not None:
+            actions = list(actions) + [type(self).updated_at.set(self.updated_at),
+                                       type(self).updated_by.set(self.updated_by)]
+
         return Model.update(self, attributes, actions, condition, conditional_operator, **expected_values)
 
     def to_dict(self):
-        return json.loads(json.dumps(self, cls=ModelEncoder))
+        return to_primitive(self)
@@ -1,9 +1,10 @@
 import importlib
+import threading
 
 import flask
 import flask_cors
 
-from core import configuration, db
+from core import configuration, db, resource, utils
 
 import logging
 from logging import config as logging_config
@@ -15,13 +16,30 @@ SETTINGS = 'settings'
 LOGGING = 'logging'
 MODELS = 'models'
 APP = 'app'
+LAZY_APP = 'lazy_app'
 
 # Full init sequence. Order matters.
 FULL_STAGES_LIST = (SETTINGS, APP, LOGGING, MODELS)
 
+# Init sequence of the deployed API, whose services are imported on the first request to their paths
+COLD_START_STAGES_LIST = (SETTINGS, LAZY_APP, LOGGING, MODELS)
+
 # Set the list of service names which expose API endpoints
 SERVICE_NAMES = ['error', 'events', 'guest', 'organizations', 'root', 'users']
 
+# Services registered with the app created by the lazy app stage, their error handlers apply to every request
+EAGER_SERVICE_NAMES = ['error']
+
+# Services whose routes match the paths starting with a segment, the other paths load every service. The root
+# lists the links of every service.
+SERVICE_PATH_SEGMENTS = {
+    '': SERVICE_NAMES,
+    'events': ['events'],
+    'guests': ['guest'],
+    'organizations': ['organizations', 'events'],
+    'users': ['users'],
+}
+
 
 stages_done = {}
 app = None
@@ -30,7 +48,8 @@ app = None
 def init_logging():
     root_logger = logging.getLogger()
     root_logger.handlers = []
-    logging_config.dictConfig(configuration.get_setting('logging'))
+    # The settings are read-only, dictConfig changes the config it is given
+    logging_config.dictConfig(utils.thaw(configuration.get_setting('logging')))
     logger.info('Configured logging')
 
 
@@ -41,16 +60,65 @@ def init_models():
     db.init_models(service_name, stage)
 
 
+class LazyServicesFlask(flask.Flask):
+    """
+    Application registering the blueprints of the services on the first request to one of their paths (see
+    SERVICE_PATH_SEGMENTS), so a cold start only imports the route modules of the request it serves
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded_services = set()
+        self._services_lock = threading.Lock()
+
+    def request_context(self, environ):
+        # Flask refuses to register blueprints after the first request in debug mode, as run locally
+        if self.debug:
+            self.load_services(SERVICE_NAMES)
+        else:
+            segment = environ.get('PATH_INFO', '/').lstrip('/').split('/', 1)[0]
+            self.load_services(SERVICE_PATH_SEGMENTS.get(segment, SERVICE_NAMES))
+
+        return super().request_context(environ)
+
+    def load_services(self, names):
+        if self.loaded_services.issuperset(names):
+            return
+
+        with self._services_lock:
+            for name in names:
+                if name not in self.loaded_services:
+                    register_service(self, name)
+                    self.loaded_services.add(name)
+
+
+def create_app(app_class=flask.Flask):
+    new_app = app_class(__name__)
+    new_app.json_encoder = resource.JSONEncoder
+    # Add 'Access-Control-Allow-Origin' header to every response
+    flask_cors.CORS(new_app)
+
+    return new_app
+
+
+def register_service(service_app, name):
+    service = importlib.import_module("services.%s.routes" % name)
+    service_app.register_blueprint(service.blueprint)
+    logger.debug("Registered service '%s'", name)
+
+
 def init_app():
     global app
-    app = flask.Flask(__name__)
-    # Add 'Access-Control-Allow-Origin' header to every response
-    flask_cors.CORS(app)
+    app = create_app()
 
     # Scan for any registered blueprints
     for name in SERVICE_NAMES:
-        service = importlib.import_module("services.%s.routes" % name)
-        app.register_blueprint(service.blueprint)
+        register_service(app, name)
+
+
+def init_lazy_app():
+    global app
+    app = create_app(LazyServicesFlask)
+    app.load_services(EAGER_SERVICE_NAMES)
 
 
 INIT_STAGES = {
@@ -58,6 +126,7 @@ INIT_STAGES = {
     LOGGING: init_logging,
     MODELS: init_models,
     APP: init_app,
+    LAZY_APP: init_lazy_app,
 }
 
 
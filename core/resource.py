@@ -1,16 +1,160 @@
+import hashlib
+import json
+
+from operator import attrgetter
+
+import flask
+
 from marshmallow import fields
 from flask_marshmallow import Marshmallow
 
+from core import errors
+from core.db.model import to_primitive
+
 ma = Marshmallow()
 
 
+MAX_PAGE_SIZE = 100
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class PaginationSchema(ma.Schema):
+    class Meta:
+        strict = True
+
+    limit = fields.Integer(required=False, missing=None, validate=lambda val: 1 <= val <= MAX_PAGE_SIZE)
+    cursor = fields.Str(required=False, missing=None)
+
+
 class PagedSchema(ma.Schema):
     class Meta:
-        fields = (
-            '_links',
-            'objects',
-        )
-
-    pages = fields.Integer(dump_to='pages', dump_only=True)
-    limit = fields.Integer(dump_to='limit', dump_only=True)
-    total = fields.Integer(dump_to='total', dump_only=True)
+        strict = True
+
+    objects = fields.List(fields.Raw(), dump_only=True)
+    size = fields.Integer(dump_only=True)
+    _links = fields.Dict(dump_only=True)
+
+
+pagination_schema = PaginationSchema()
+paged_schema = PagedSchema()
+
+
+class JSONEncoder(flask.json.JSONEncoder):
+    """
+    JSON encoder of the application (see init_app), encoding the models in place from their attribute values
+    """
+    def default(self, o):
+        if hasattr(o, 'attribute_values'):
+            return to_primitive(o)
+        if isinstance(o, (set, frozenset)):
+            return list(o)
+
+        return super().default(o)
+
+
+def get_paged_response(objects, size, next_cursor):
+    """
+    Returns a page of objects, linking to the next page of the current request when there is one
+    :param objects: The serialized objects of the page
+    :param size: The requested size of the page
+    :param next_cursor: The cursor of the next page (None on the last page)
+    :return: The page response
+    """
+    return flask.jsonify(paged_schema.dump({'objects': objects, 'size': size, '_links': get_links(next_cursor)}))
+
+
+def get_links(next_cursor):
+    """
+    Returns the links of a response, to the current request resumed from the cursor when one is set
+
+    The query parameters named as a view argument or as a url_for option (starting with an underscore) are dropped
+    """
+    links = {}
+    if next_cursor:
+        args = {name: value for name, value in flask.request.args.items() if not name.startswith('_')}
+        args['cursor'] = next_cursor
+        links['next_page'] = flask.url_for(flask.request.endpoint, **{**args, **flask.request.view_args})
+
+    return links
+
+
+def get_streamed_list_response(objects):
+    """
+    Returns a response writing the objects as a JSON array, one object at a time as they are produced
+
+    Only the objects being written are held in memory, not the list of all the objects and of their dumps. The
+    deployed handler (serverless-wsgi) still collects the whole body before returning it to API Gateway, so the
+    body itself is held in memory on Lambda. The streamed responses have no ETag and are not cached.
+    :param objects: Iterator of the objects to be serialized
+    :return: The streamed response
+    """
+    def generate():
+        yield '['
+        for index, obj in enumerate(objects):
+            yield ',' + flask.json.dumps(obj) if index else flask.json.dumps(obj)
+        yield ']'
+
+    return flask.Response(flask.stream_with_context(generate()), mimetype='application/json')
+
+
+def get_etag(items, *keys):
+    """
+    Returns a strong ETag of the items, changing whenever one of them is updated, added or removed
+    :param items: The items of the response, with their id and updated_at attributes
+    :param keys: The other values the response depends on (e.g. the filters)
+    :return: The ETag value
+    """
+    digest = hashlib.sha1(repr(keys).encode())
+    for item in sorted(items, key=attrgetter('id')):
+        updated_at = item.updated_at.isoformat() if item.updated_at else ''
+        digest.update('{}@{};'.format(item.id, updated_at).encode())
+
+    return digest.hexdigest()
+
+
+def get_not_modified_response(etag):
+    """
+    Returns a 304 Not Modified response if the request already has the version of the ETag, otherwise None
+    """
+    if not flask.request.if_none_match.contains(etag):
+        return None
+
+    response = flask.Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def set_etag(response, etag):
+    response.set_etag(etag)
+    return response
+
+
+def get_request_records(max_records):
+    """
+    Returns the records of a request body holding either a JSON array or newline delimited JSON (NDJSON)
+    :param max_records: The maximum number of records accepted
+    :return: The list of the records, whose content is not validated
+    """
+    request = flask.request
+
+    if request.mimetype == NDJSON_MIMETYPE:
+        records = []
+        for line_num, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                raise errors.BadRequestError(messages={'body': ['Invalid JSON on line {}'.format(line_num)]})
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            raise errors.BadRequestError(messages={'body': ['Must be a JSON array or newline delimited JSON']})
+
+    if len(records) > max_records:
+        message = 'Must hold at most {} records'.format(max_records)
+        raise errors.BadRequestError(messages={'body': [message]})
+
+    return records
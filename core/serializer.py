@@ -0,0 +1,155 @@
+import functools
+
+from marshmallow import Schema, fields, missing, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+# Number of formatted values kept per date field
+DATE_FORMAT_CACHE_SIZE = 1024
+
+
+class FastSerializer:
+    """
+    Serializer producing the same output as the dump of a schema, for the schemas dumped on the hot paths
+
+    The fields of the schema are compiled once into functions reading and formatting their values directly,
+    instead of going through the generic field machinery of marshmallow for every field of every object. The
+    fields without a compiled function are dumped by marshmallow, as is the whole object when the schema has
+    dump processors or a custom get_attribute.
+
+    The attributes of pynamodb models (or of any class with the same get_attributes and attribute_values) are
+    read from their attribute values, skipping the attribute descriptors.
+    """
+    def __init__(self, schema):
+        self.schema = schema
+        self._dict_class = schema.dict_class
+        self._fields = get_compiled_fields(schema) if is_compilable(schema) else None
+        self._dotted = self._fields is not None and any('.' in attribute for _, attribute, _, _ in self._fields)
+        self._stored_fields = {}
+
+    def dump(self, obj, many=None):
+        """
+        Serialize an object, or a collection of objects when many is set, like schema.dump
+        """
+        many = self.schema.many if many is None else bool(many)
+
+        if self._fields is None or obj is None:
+            return self.schema.dump(obj, many=many)
+
+        if many:
+            return [self._dump(item) for item in obj]
+
+        return self._dump(obj)
+
+    def _dump(self, obj):
+        # The objects without item access are read with getattr, as marshmallow does for them
+        get_value = utils.get_value if self._dotted or hasattr(obj, '__getitem__') else getattr
+
+        stored_fields = self._get_stored_fields(type(obj))
+        values = obj.attribute_values if stored_fields else None
+
+        result = self._dict_class()
+        for key, attribute, serialize, default in self._fields:
+            if attribute in stored_fields:
+                value = values.get(attribute)
+            else:
+                value = get_value(obj, attribute, missing)
+
+            if value is missing:
+                if default is missing:
+                    continue
+                value = default() if callable(default) else default
+
+            result[key] = serialize(value, obj)
+
+        return result
+
+    def _get_stored_fields(self, cls):
+        """
+        Returns the attributes of the fields stored in the attribute values of the objects of a class
+        """
+        stored_fields = self._stored_fields.get(cls)
+
+        if stored_fields is None:
+            get_attributes = getattr(cls, 'get_attributes', None)
+            attributes = get_attributes() if callable(get_attributes) and not self._dotted else {}
+            stored_fields = frozenset(attribute for _, attribute, _, _ in self._fields if attribute in attributes)
+            self._stored_fields[cls] = stored_fields
+
+        return stored_fields
+
+
+def is_compilable(schema):
+    return (type(schema).get_attribute is Schema.get_attribute
+            and not schema._has_processors(PRE_DUMP)
+            and not schema._has_processors(POST_DUMP)
+            and all(field._CHECK_ATTRIBUTE for field in schema.dump_fields.values()))
+
+
+def get_compiled_fields(schema):
+    """
+    Returns the (key, attribute, serialize function, default) entries of the dumped fields of a schema
+    """
+    compiled_fields = []
+
+    for name, field in schema.dump_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute if field.attribute is not None else name
+        default = getattr(field, 'default', missing)
+
+        compiled_fields.append((key, attribute, compile_field(field, name), default))
+
+    return compiled_fields
+
+
+def compile_field(field, name):
+    """
+    Returns the function serializing a value of a field, given the value and the object it is read from
+    """
+    field_type = type(field)
+
+    if field_type is fields.String:
+        return lambda value, obj: None if value is None else utils.ensure_text_type(value)
+
+    if field_type is fields.Integer and not field.as_string:
+        return lambda value, obj: None if value is None else int(value)
+
+    if field_type is fields.Boolean:
+        truthy, falsy = field.truthy, field.falsy
+
+        def serialize_boolean(value, obj):
+            if value is None:
+                return None
+            if value in truthy:
+                return True
+            if value in falsy:
+                return False
+            return bool(value)
+
+        return serialize_boolean
+
+    if field_type is fields.DateTime:
+        data_format = field.format or field.DEFAULT_FORMAT
+        format_function = field.SERIALIZATION_FUNCS.get(data_format) or (lambda value: value.strftime(data_format))
+
+        # The same few dates and times are formatted again and again in a listing
+        format_function = functools.lru_cache(maxsize=DATE_FORMAT_CACHE_SIZE)(format_function)
+        return lambda value, obj: None if value is None else format_function(value)
+
+    if field_type is fields.Nested:
+        serializer = FastSerializer(field.schema)
+        many = field.schema.many or field.many
+        return lambda value, obj: None if value is None else serializer.dump(value, many=many)
+
+    if field_type is fields.List and type(field.inner) is fields.Nested and not field.inner.many:
+        serializer = FastSerializer(field.inner.schema)
+        return lambda value, obj: None if value is None else serializer.dump(value, many=True)
+
+    if field_type is fields.List:
+        serialize_inner = compile_field(field.inner, name)
+        return lambda value, obj: None if value is None else [serialize_inner(each, obj) for each in value]
+
+    if field_type is fields.Raw:
+        return lambda value, obj: value
+
+    return lambda value, obj: field._serialize(value, name, obj)
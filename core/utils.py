@@ -1,3 +1,6 @@
+from types import MappingProxyType
+
+
 def deep_merge(source, destination):
     """
     https://stackoverflow.com/questions/20656135/python-deep-merge-dictionary-data
@@ -18,3 +21,31 @@ def deep_merge(source, destination):
 
     return destination
 
+
+def freeze(value):
+    """
+    Returns a read-only copy of a value, its dicts being copied to mapping proxies and its lists to tuples
+
+    >>> frozen = freeze({'loggers': {'core': {'level': 'DEBUG'}}, 'handlers': ['console']})
+    >>> frozen['loggers']['core']['level'], frozen['handlers']
+    ('DEBUG', ('console',))
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+
+    return value
+
+
+def thaw(value):
+    """
+    Returns a mutable copy of a value frozen by freeze, for the functions changing the values they are given (as
+    logging.config.dictConfig)
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+
+    return value
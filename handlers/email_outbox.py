@@ -0,0 +1,14 @@
+from core import init
+from core.aws import outbox
+
+
+def handler(event, context):
+    """
+    Handler of the scheduled event sending the emails queued in the outbox
+    :param event: The scheduled event
+    :param context: The object containing runtime information (request ID, remaining time, etc.)
+    :return: The number of emails sent, attempted again later and given up
+    """
+    init.init_application(required_stages=(init.SETTINGS, init.LOGGING, init.MODELS))
+
+    return outbox.drain_outbox(context.get_remaining_time_in_millis)
@@ -0,0 +1,14 @@
+from core import init
+from services.events.index import extend_events_index
+
+
+def handler(event, context):
+    """
+    Handler of the scheduled event indexing the occurrences of the rule based events up to the index horizon
+    :param event: The scheduled event
+    :param context: The object containing runtime information (request ID, remaining time, etc.)
+    :return: The number of events extended and the number of events which could not be extended
+    """
+    init.init_application(required_stages=(init.SETTINGS, init.LOGGING, init.MODELS))
+
+    return extend_events_index(context.get_remaining_time_in_millis)
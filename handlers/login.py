@@ -1,7 +1,7 @@
 import json
 import os
 
-import boto3
+from core.aws.clients import get_client
 
 
 def handler(event, context):
@@ -27,7 +27,7 @@ def handler(event, context):
                 })
                 }
 
-    cognito = boto3.client('cognito-idp')
+    cognito = get_client('cognito-idp')
     try:
         # Authenticate the user
         user_pool_id = os.environ['COGNITO_USER_POOL_USERS_ID']
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Compare the time a warm invocation takes to get the AWS clients it uses (caller identity, emails and login), when
+they are created on every invocation and when they are kept by the client registry
+"""
+import argparse
+import os
+import timeit
+
+import boto3
+
+import fixtures  # noqa: F401
+from core.aws import clients
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-n', '--invocations', type=int, default=50,
+                             help='Number of warm invocations per run')
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of timed runs, the best one is reported')
+args = argument_parser.parse_args()
+
+# The clients are created without credentials, no request is sent
+os.environ.setdefault('AWS_DEFAULT_REGION', os.environ['AWS_REGION'])
+
+INVOCATION_CLIENTS = [('sts', None), ('ses', 'us-east-1'), ('cognito-idp', None)]
+
+
+def invoke_creating_clients():
+    return [boto3.client(service_name, region_name=region_name) for service_name, region_name in INVOCATION_CLIENTS]
+
+
+def invoke_with_registry():
+    return [clients.get_client(service_name, region_name) for service_name, region_name in INVOCATION_CLIENTS]
+
+
+# The first invocation of the container creates the clients of the registry
+cold = timeit.timeit(invoke_with_registry, number=1)
+assert all(client is registry_client for client, registry_client in zip(invoke_with_registry(),
+                                                                        invoke_with_registry()))
+
+print('Clients of {} warm invocations ({} per invocation, first creation {:.2f} ms)'.format(
+    args.invocations, len(INVOCATION_CLIENTS), cold * 1000))
+for label, function in {'created per invocation': invoke_creating_clients, 'registry': invoke_with_registry}.items():
+    best = min(timeit.repeat(function, number=args.invocations, repeat=args.repeat)) / args.invocations
+    print('  {:<30} {:>10.3f} ms per invocation'.format(label, best * 1000))
+
+config = clients.get_client_config()
+print('  pool of {} connections, retries {}'.format(config.max_pool_connections, config.retries))
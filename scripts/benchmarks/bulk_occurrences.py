@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Compare setting the occurrences of the events of a bulk creation with and without the memoized occurrences of
+their recurrence rules
+"""
+import argparse
+import random
+import timeit
+
+from datetime import timedelta
+
+from fixtures import START_DATE
+from services.events import create_utils, recurrence
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-n', '--events', type=int, default=2000,
+                             help='Number of events created per run')
+argument_parser.add_argument('-d', '--distinct', type=int, default=50,
+                             help='Number of distinct dates and recurrence rules among the events')
+argument_parser.add_argument('-o', '--occurrences', type=int, default=52,
+                             help='Number of occurrences of the recurring events')
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of timed runs, the best one is reported')
+args = argument_parser.parse_args()
+
+
+def make_event_args(rng):
+    start_date = START_DATE + timedelta(days=rng.randint(0, 60))
+    recurrence_details = {'recurrence': rng.choice(['DAILY', 'WEEKLY', 'BI-WEEKLY', 'MONTHLY']),
+                          'occurrence_type': 'AFTER', 'num_recurrences': args.occurrences}
+
+    if rng.random() < 0.3:
+        recurrence_details.update(recurrence='MONTHLY', day_of_week=rng.randint(1, 7), week_of_month=2,
+                                  separation_count=1)
+
+    return {'start_date': start_date, 'end_date': start_date + timedelta(days=rng.choice([0, 1])),
+            'recurrence_details': recurrence_details}
+
+
+def populate(events_args):
+    return [create_utils.populate_occurrences(**event_args) for event_args in events_args]
+
+
+def populate_memoized(events_args):
+    recurrence.get_rule_occurrences.cache_clear()
+    return populate(events_args)
+
+
+def populate_unmemoized(events_args):
+    get_rule_occurrences = recurrence.get_rule_occurrences
+    recurrence.get_rule_occurrences = get_rule_occurrences.__wrapped__
+    try:
+        return populate(events_args)
+    finally:
+        recurrence.get_rule_occurrences = get_rule_occurrences
+
+
+rng = random.Random(0)
+distinct_args = [make_event_args(rng) for _ in range(args.distinct)]
+events_args = [dict(rng.choice(distinct_args)) for _ in range(args.events)]
+
+assert populate_memoized(events_args) == populate_unmemoized(events_args)
+
+print('{} events, {} distinct dates and rules (identical occurrences)'.format(args.events, args.distinct))
+for label, function in {'generated': populate_unmemoized, 'memoized': populate_memoized}.items():
+    best = min(timeit.repeat(lambda: function(events_args), number=1, repeat=args.repeat))
+    print('  {:<30} {:>10.2f} ms'.format(label, best * 1000))
+
+metrics = recurrence.get_occurrences_cache_metrics()
+print('  hit ratio {hit_ratio:.1%} ({hits} hits, {misses} misses, {size} entries)'.format(**metrics))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Compare deserializing scanned event items with the fixed format date parsers and with dateutil
+"""
+import argparse
+import timeit
+
+from dateutil import parser as dateutil_parser
+
+from fixtures import make_events
+from core.db.events import model
+from core.db.events.model import EventModel
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-n', '--events', type=int, default=1000,
+                             help='Number of scanned events deserialized per run')
+argument_parser.add_argument('-o', '--occurrences', type=int, default=10,
+                             help='Number of occurrences per event')
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of timed runs, the best one is reported')
+args = argument_parser.parse_args()
+
+
+def get_raw_item(event):
+    # The item as returned by a scan: the keys and the attributes in the same DynamoDB format
+    serialized = event._serialize()
+    item = dict(serialized['attributes'])
+    item['id'] = {'S': serialized['HASH']}
+    item['owner'] = {'S': serialized['RANGE']}
+    return item
+
+
+def deserialize(items):
+    return [EventModel.from_raw_data(item) for item in items]
+
+
+def deserialize_cold(items):
+    model.parse_date.cache_clear()
+    model.parse_time.cache_clear()
+    return deserialize(items)
+
+
+def deserialize_dateutil(items):
+    parse_date, parse_time = model.parse_date, model.parse_time
+    model.parse_date = model.parse_time = dateutil_parser.parse
+    try:
+        return deserialize(items)
+    finally:
+        model.parse_date, model.parse_time = parse_date, parse_time
+
+
+def get_dates(event):
+    return ([event.start_date, event.end_date, event.start_time.time(), event.end_time.time()]
+            + [(occurrence.start_date, occurrence.end_date) for occurrence in event.occurrences])
+
+
+items = [get_raw_item(event) for event in make_events(args.events, args.occurrences)]
+
+# The times are parsed on today's date by dateutil and on 1900-01-01 by the fixed format parser
+assert list(map(get_dates, deserialize_cold(items))) == list(map(get_dates, deserialize_dateutil(items)))
+
+timings = {
+    'dateutil': lambda: deserialize_dateutil(items),
+    'fixed format (cold cache)': lambda: deserialize_cold(items),
+    'fixed format (warm cache)': lambda: deserialize(items),
+}
+
+print('{} events, {} occurrences each (identical dates)'.format(args.events, args.occurrences))
+for label, function in timings.items():
+    best = min(timeit.repeat(function, number=1, repeat=args.repeat))
+    print('  {:<30} {:>10.2f} ms'.format(label, best * 1000))
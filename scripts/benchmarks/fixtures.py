@@ -0,0 +1,93 @@
+"""
+Synthetic data and measurement helpers shared by the benchmark scripts
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# The models read the region when they are imported
+os.environ.setdefault('AWS_REGION', 'ca-central-1')
+
+from core.db.events.model import EventModel, OccurrenceDetail  # noqa: E402
+from core.db.organizations.model import OrganizationModel  # noqa: E402
+
+START_DATE = datetime(2019, 10, 7)
+CATEGORIES = ['arts', 'community', 'education', 'health', 'sports']
+
+
+def make_event(index, num_occurrences=10):
+    """
+    Returns a weekly event as loaded from the database, with all of its attributes set
+    """
+    start_date = START_DATE + timedelta(days=index % 7)
+    occurrences = [OccurrenceDetail(occurrence_num=num + 1,
+                                    start_date=start_date + timedelta(weeks=num),
+                                    end_date=start_date + timedelta(weeks=num))
+                   for num in range(num_occurrences)]
+
+    return EventModel(
+        'event-{}'.format(index),
+        'organization-{}'.format(index % 50),
+        owner_name='Organization {}'.format(index % 50),
+        name='Event {}'.format(index),
+        description='Description of event {} '.format(index) * 10,
+        contact_email='contact{}@example.com'.format(index),
+        categories=CATEGORIES[index % len(CATEGORIES):][:2],
+        start_date=start_date,
+        end_date=occurrences[-1].end_date,
+        start_time=datetime(1900, 1, 1, 18, 30),
+        end_time=datetime(1900, 1, 1, 20, 0),
+        location='{} Queen Street'.format(index),
+        is_recurring=True,
+        recurrence_details={'recurrence': 'WEEKLY', 'occurrence_type': 'AFTER', 'num_recurrences': num_occurrences},
+        occurrences=occurrences,
+        created_at=datetime(2019, 10, 1),
+        created_by='benchmark',
+        updated_at=datetime(2019, 10, 1),
+        updated_by='benchmark',
+    )
+
+
+def make_events(count, num_occurrences=10):
+    return [make_event(index, num_occurrences) for index in range(count)]
+
+
+def make_organization(index):
+    return OrganizationModel(
+        'organization-{}'.format(index),
+        name='Organization {}'.format(index),
+        search_name='organization {}'.format(index),
+        email='organization{}@example.com'.format(index),
+        phone='506-555-{:04d}'.format(index % 10000),
+        administrator_id='user-{}'.format(index),
+        address={'street': '{} King Street'.format(index), 'postal_code': 'E3B 1A1', 'city': 'Fredericton',
+                 'province': 'NB', 'country': 'Canada'},
+        is_verified=index % 3 != 0,
+        created_at=datetime(2019, 10, 1),
+        created_by='benchmark',
+        updated_at=datetime(2019, 10, 1),
+        updated_by='benchmark',
+    )
+
+
+def measure(function, *args, **kwargs):
+    """
+    Runs the function once, returning its elapsed seconds and peak allocated bytes
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def report(label, elapsed, peak):
+    print('{:<40} {:>10.1f} ms {:>12.1f} KiB'.format(label, elapsed * 1000, peak / 1024))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Compare converting and encoding event and organization items with the JSON round trip and the direct converter
+"""
+import argparse
+import json
+import timeit
+
+import flask
+
+from fixtures import make_events, make_organization
+from core.db.model import ModelEncoder
+from core.resource import JSONEncoder
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--items', type=int, default=1000,
+                    help='Number of items converted per run')
+parser.add_argument('-r', '--repeat', type=int, default=5,
+                    help='Number of timed runs, the best one is reported')
+args = parser.parse_args()
+
+app = flask.Flask(__name__)
+app.json_encoder = JSONEncoder
+
+
+def round_trip_to_dict(item):
+    # BaseModel.to_dict before the direct converter
+    return json.loads(json.dumps(item, cls=ModelEncoder))
+
+
+cases = [
+    ('events', make_events(args.items)),
+    ('organizations', [make_organization(index) for index in range(args.items)]),
+]
+
+with app.app_context():
+    for label, items in cases:
+        expected = [round_trip_to_dict(item) for item in items]
+        assert [item.to_dict() for item in items] == expected, label
+        assert flask.jsonify(items).get_data() == flask.jsonify(expected).get_data(), label
+
+        timings = {
+            'to_dict (JSON round trip)': lambda: [round_trip_to_dict(item) for item in items],
+            'to_dict (direct)': lambda: [item.to_dict() for item in items],
+            'jsonify (round trip dicts)': lambda: flask.jsonify([round_trip_to_dict(item) for item in items]),
+            'jsonify (items)': lambda: flask.jsonify(items),
+        }
+
+        print('{} {} (identical output)'.format(len(items), label))
+        for name, function in timings.items():
+            best = min(timeit.repeat(function, number=1, repeat=args.repeat))
+            print('  {:<30} {:>10.2f} ms'.format(name, best * 1000))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Compare listing occurrences through deep copies of the event with the read-only occurrence views
+"""
+import argparse
+import copy
+
+from fixtures import make_events, measure, report
+from services.events.occurrences import get_recurring_event
+
+
+def list_with_deepcopy(events):
+    occurrences = []
+    for event in events:
+        for occurrence in event.occurrences:
+            new_event = copy.deepcopy(event)
+            new_event.occurrence_num = occurrence.occurrence_num
+            new_event.start_date = occurrence.start_date
+            new_event.end_date = occurrence.end_date
+            occurrences.append(new_event)
+
+    return occurrences
+
+
+def list_with_views(events):
+    return [get_recurring_event(event, occurrence) for event in events for occurrence in event.occurrences]
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--events', type=int, nargs='+', default=[1000, 10000],
+                    help='Number of events listed')
+parser.add_argument('-o', '--occurrences', type=int, default=10,
+                    help='Number of occurrences per event')
+args = parser.parse_args()
+
+for count in args.events:
+    events = make_events(count, args.occurrences)
+    print('{} events, {} occurrences each'.format(count, args.occurrences))
+    report('  copy.deepcopy', *measure(list_with_deepcopy, events))
+    report('  EventOccurrence', *measure(list_with_views, events))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Check the occurrences of random recurrence rules in random date ranges against their brute force expansion, and
+compare the time taken to expand the occurrences in a date range by jumping to it and by stepping through the
+occurrences before it
+"""
+import argparse
+import random
+import timeit
+
+from datetime import datetime, timedelta
+from itertools import takewhile
+
+from fixtures import START_DATE
+from services.events import recurrence
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-c', '--checks', type=int, default=5000,
+                             help='Number of random rules and date ranges checked')
+argument_parser.add_argument('-y', '--years', type=int, default=10,
+                             help='Age in years of the series whose expansion is timed')
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of timed runs, the best one is reported')
+argument_parser.add_argument('-s', '--seed', type=int, default=0)
+args = argument_parser.parse_args()
+
+RECURRENCES = ['DAILY', 'WEEKLY', 'BI-WEEKLY', 'MONTHLY']
+
+
+def make_rule(rng):
+    rule = {'recurrence': rng.choice(RECURRENCES), 'occurrence_type': rng.choice(['AFTER', 'ON', 'NEVER']),
+            'num_recurrences': rng.randint(1, 200), 'on_end_date': START_DATE + timedelta(days=rng.randint(0, 3000))}
+
+    if rng.random() < 0.4:
+        rule.update(recurrence='MONTHLY', day_of_week=rng.randint(1, 7), week_of_month=rng.choice([1, 2, 3, 4, -1]),
+                    separation_count=rng.randint(1, 3))
+
+    return rule
+
+
+def expand_in_range_brute_force(start_date, end_date, rule, range_start_date, range_end_date):
+    occurrences = takewhile(lambda occurrence: occurrence[1] <= range_end_date,
+                            recurrence.iter_occurrence_dates(start_date, end_date, rule))
+
+    return [occurrence for occurrence in occurrences if occurrence[2] >= range_start_date]
+
+
+def check(rng):
+    # Dates at the end of the months and long occurrences are the cases the month lengths put off
+    start_date = START_DATE + timedelta(days=rng.choice([0, 23, 24, 25, 26, 27, 28, 29, 30]) + rng.randint(0, 400))
+    end_date = start_date + timedelta(days=rng.choice([0, 0, 1, 3, 20, 45]))
+    rule = make_rule(rng)
+    range_start_date = start_date + timedelta(days=rng.randint(-30, 3500))
+    range_end_date = range_start_date + timedelta(days=rng.choice([0, 1, 6, 7, 30, 90]))
+
+    expected = expand_in_range_brute_force(start_date, end_date, rule, range_start_date, range_end_date)
+    occurrences = list(recurrence.iter_occurrence_dates_in_range(start_date, end_date, rule, range_start_date,
+                                                                 range_end_date))
+    assert occurrences == expected, (start_date, end_date, rule, range_start_date, range_end_date)
+
+    for occurrence_num, occurrence_start_date, occurrence_end_date in expected:
+        assert recurrence.get_occurrence_dates(start_date, end_date, rule, occurrence_num) == \
+            (occurrence_start_date, occurrence_end_date), (start_date, end_date, rule, occurrence_num)
+
+
+rng = random.Random(args.seed)
+for _ in range(args.checks):
+    check(rng)
+print('{} random rules and date ranges: identical occurrences'.format(args.checks))
+
+range_start_date = datetime(START_DATE.year + args.years, 3, 2)
+range_end_date = range_start_date + timedelta(days=7)
+rules = {
+    'daily': {'recurrence': 'DAILY', 'occurrence_type': 'NEVER'},
+    'weekly': {'recurrence': 'WEEKLY', 'occurrence_type': 'NEVER'},
+    'monthly': {'recurrence': 'MONTHLY', 'occurrence_type': 'NEVER'},
+    'monthly (2nd tuesday)': {'recurrence': 'MONTHLY', 'occurrence_type': 'NEVER', 'day_of_week': 2,
+                              'week_of_month': 2, 'separation_count': 1},
+}
+
+print('Occurrences in a week {} years after the start of the series'.format(args.years))
+for label, rule in rules.items():
+    timings = {
+        'stepping': lambda: expand_in_range_brute_force(START_DATE, START_DATE, rule, range_start_date,
+                                                        range_end_date),
+        'window jump': lambda: list(recurrence.iter_occurrence_dates_in_range(START_DATE, START_DATE, rule,
+                                                                              range_start_date, range_end_date)),
+    }
+
+    for method, function in timings.items():
+        best = min(timeit.repeat(function, number=10, repeat=args.repeat)) / 10
+        print('  {:<36} {:>10.3f} ms'.format('{} {}'.format(label, method), best * 1000))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Check the fast serializers dump the same output as their schemas and compare their dumps per second
+"""
+import argparse
+import timeit
+
+from fixtures import make_events, make_organization
+from services.events.occurrences import get_recurring_event
+from services.events.resource import event_list_schema, event_list_serializer, event_occurrence_details_schema, \
+    event_occurrence_details_serializer
+from services.guest.resource import organization_list_schema, organization_list_serializer
+from services.organizations.resource import organization_schema, organization_serializer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--objects', type=int, default=5000,
+                    help='Number of objects dumped per run')
+parser.add_argument('-r', '--repeat', type=int, default=5,
+                    help='Number of timed runs, the best one is reported')
+args = parser.parse_args()
+
+events = make_events(max(args.objects // 10, 1))
+
+# Events with unset optional attributes and a freshly created event, whose occurrences are plain dicts
+events[0].description = None
+events[0].recurrence_details = None
+events[1].categories = []
+created_event = make_events(1)[0]
+created_event.occurrences = [occurrence.attribute_values for occurrence in created_event.occurrences]
+
+occurrences = [get_recurring_event(event, occurrence) for event in events
+               for occurrence in event.occurrences][:args.objects]
+organizations = [make_organization(index) for index in range(args.objects)]
+organizations[0].phone = None
+
+cases = [
+    ('EventListSchema', event_list_schema, event_list_serializer, occurrences),
+    ('EventListSchema (stored occurrences)', event_list_schema, event_list_serializer, events[0].occurrences),
+    ('EventListSchema (created occurrences)', event_list_schema, event_list_serializer, created_event.occurrences),
+    ('EventOccurrenceDetailsSchema', event_occurrence_details_schema, event_occurrence_details_serializer,
+     occurrences),
+    ('OrganizationSchema', organization_schema, organization_serializer, organizations),
+    ('OrganizationListSchema', organization_list_schema, organization_list_serializer, organizations),
+]
+
+for label, schema, serializer, objects in cases:
+    expected = schema.dump(objects, many=True)
+    assert serializer.dump(objects, many=True) == expected, label
+    assert [serializer.dump(obj) for obj in objects] == expected, label
+
+    marshmallow_time = min(timeit.repeat(lambda: schema.dump(objects, many=True), number=1, repeat=args.repeat))
+    fast_time = min(timeit.repeat(lambda: serializer.dump(objects, many=True), number=1, repeat=args.repeat))
+
+    print('{} ({} objects, identical output)'.format(label, len(objects)))
+    print('  {:<12} {:>12.0f} dumps/s'.format('marshmallow', len(objects) / marshmallow_time))
+    print('  {:<12} {:>12.0f} dumps/s  x{:.1f}'.format('fast', len(objects) / fast_time,
+                                                      marshmallow_time / fast_time))
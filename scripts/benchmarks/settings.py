@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Compare initializing the settings by parsing the YAML config and merging the whole environment into it, and by
+reading the compiled config and merging the environment variables of the settings only into a frozen snapshot
+
+The import of PyYAML the parsing needs on a cold start is left out (see startup.py)
+"""
+import argparse
+import os
+import timeit
+
+import fixtures  # noqa: F401
+from core import configuration, utils
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-s', '--stage', default=os.environ.get('STAGE', 'dev'),
+                             help='Stage whose config is read')
+argument_parser.add_argument('-n', '--number', type=int, default=200,
+                             help='Number of initializations per run')
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of timed runs, the best one is reported')
+args = argument_parser.parse_args()
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '../..'))
+os.chdir(ROOT_DIR)
+os.environ['STAGE'] = args.stage
+os.environ.setdefault('SERVICE_NAME', 'caring-fred')
+
+config_file = 'configs/%s.yaml' % args.stage
+configuration.compile_config(config_file)
+
+
+def init_parsed_settings():
+    settings = {}
+    with open(config_file, 'rb') as f:
+        utils.deep_merge(configuration.parse_config(f.read()), settings)
+    utils.deep_merge(os.environ, settings)
+
+    return settings
+
+
+def init_compiled_settings():
+    configuration.settings = utils.freeze({})
+    configuration.init_settings()
+
+    return configuration.settings
+
+
+parsed, compiled = init_parsed_settings(), init_compiled_settings()
+assert all(utils.thaw(compiled[name]) == parsed[name] for name in compiled)
+
+print('Settings of stage {} ({} environment variables, {} merged into the frozen settings)'.format(
+    args.stage, len(os.environ), len(configuration.get_environment_settings(compiled))))
+for label, function in {'yaml + environment': init_parsed_settings,
+                        'compiled + settings variables': init_compiled_settings}.items():
+    best = min(timeit.repeat(function, number=args.number, repeat=args.repeat)) / args.number
+    print('  {:<30} {:>10.3f} ms'.format(label, best * 1000))
+
+for label, settings in {'dict': parsed, 'frozen': compiled}.items():
+    best = min(timeit.repeat(lambda: settings['hosted_zone_name'], number=100000, repeat=args.repeat)) / 100000
+    print('  {:<30} {:>10.3f} us per lookup'.format('{} lookup'.format(label), best * 1000000))
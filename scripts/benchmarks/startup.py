@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Compare the cold start of the API with its services imported and its YAML config parsed on start, and with the
+cold start stages (services imported on the first request to their paths, compiled config)
+
+Every start runs in a new interpreter, the time and resident memory after each stage are reported
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '../..'))
+
+argument_parser = argparse.ArgumentParser()
+argument_parser.add_argument('-r', '--repeat', type=int, default=5,
+                             help='Number of starts per mode, the median of each stage is reported')
+argument_parser.add_argument('--child', choices=['eager', 'cold-start'], help=argparse.SUPPRESS)
+args = argument_parser.parse_args()
+
+RESULT_PREFIX = 'STARTUP_RESULT '
+
+# Request served after the start, rejected by the validation of its body before any read of the database
+FIRST_REQUEST = ('POST', '/organizations/register')
+
+
+def get_rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+
+    return 0
+
+
+def run_start(mode):
+    sys.path.insert(0, ROOT_DIR)
+    os.chdir(ROOT_DIR)
+
+    stages = []
+    started_at = time.perf_counter()
+
+    def record(stage):
+        stages.append((stage, (time.perf_counter() - started_at) * 1000, get_rss_kb()))
+
+    record('interpreter')
+    from core import configuration, init
+    record('import core.init')
+
+    if mode == 'eager':
+        # Parse the YAML config even if it was compiled
+        configuration.get_compiled_config_file = lambda config_file: os.devnull + '.missing'
+        required_stages = init.FULL_STAGES_LIST
+    else:
+        required_stages = init.COLD_START_STAGES_LIST
+
+    for stage in required_stages:
+        init.init_application(required_stages=(stage,))
+        record(stage)
+
+    method, path = FIRST_REQUEST
+    response = init.app.test_client().open(path, method=method, json={})
+    assert response.status_code == 422, response.status_code
+    record('first request')
+
+    modules = [name for name in sys.modules if name.startswith('services.') and name.endswith('.routes')]
+    print(RESULT_PREFIX + json.dumps({'stages': stages, 'routes': len(modules)}))
+
+
+def start(mode):
+    env = dict(os.environ)
+    env.setdefault('STAGE', 'dev')
+    env.setdefault('SERVICE_NAME', 'caring-fred')
+    env.setdefault('AWS_REGION', 'ca-central-1')
+
+    # The logs of the start are shown only if it fails
+    process = subprocess.run([sys.executable, __file__, '--child', mode], env=env, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, universal_newlines=True)
+    if process.returncode:
+        sys.exit(process.stderr)
+
+    output = process.stdout
+    line = next(line for line in output.splitlines() if line.startswith(RESULT_PREFIX))
+
+    return json.loads(line[len(RESULT_PREFIX):])
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+if args.child:
+    run_start(args.child)
+    sys.exit(0)
+
+sys.path.insert(0, ROOT_DIR)
+from core import configuration  # noqa: E402
+
+configuration.compile_configs(os.path.join(ROOT_DIR, 'configs'))
+
+for mode in ['eager', 'cold-start']:
+    results = [start(mode) for _ in range(args.repeat)]
+
+    print('{} start ({} route modules imported, median of {} starts)'.format(mode, results[0]['routes'],
+                                                                           args.repeat))
+    for index, (stage, _, _) in enumerate(results[0]['stages']):
+        elapsed = median(result['stages'][index][1] for result in results)
+        rss = median(result['stages'][index][2] for result in results)
+        print('  {:<20} {:>10.1f} ms {:>10.1f} MB'.format(stage, elapsed, rss / 1024))
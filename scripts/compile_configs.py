@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+"""
+Compile the YAML configs of the stages to the JSON configs read by the deployed functions (run before packaging)
+"""
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from core import configuration  # noqa: E402
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-c', '--config-dir', default=os.path.join(ROOT_DIR, 'configs'),
+                    help='Directory of the YAML configs')
+args = parser.parse_args()
+
+for compiled_file in configuration.compile_configs(args.config_dir):
+    print('Compiled %s' % os.path.relpath(compiled_file, ROOT_DIR))
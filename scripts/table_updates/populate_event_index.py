@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+
+# =======================================================================
+# Read input parameters
+# =======================================================================
+os.chdir(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.realpath('../..'))
+
+PREFIX = 'caring-fred'
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-r', '--region', required=True,
+                    help='AWS CLI region to use')
+parser.add_argument('-s', '--stage',
+                    help='Stage name or environment such as dev, stage, uat, etc.', required=True)
+parser.add_argument('--segments', type=int, default=4,
+                    help='Number of segments the event table is scanned in')
+parser.add_argument('--workers', type=int,
+                    help='Maximum number of segments scanned at the same time')
+args = parser.parse_args()
+
+# The models read the region when they are imported
+os.environ['AWS_REGION'] = args.region
+
+from core import db  # noqa: E402
+from core.db.events.model import EventModel  # noqa: E402
+from services.events.index import save_event_index  # noqa: E402
+
+# Set the model names
+db.init_models(PREFIX, args.stage)
+
+# Write the index entries of each event
+event_list = db.parallel_scan(EventModel, total_segments=args.segments, max_workers=args.workers)
+for event in event_list:
+    print(f"Indexing event {event.id}")
+    save_event_index(event)
+
+print('Event index records updated')
@@ -2,6 +2,7 @@
 import argparse
 import boto3
 import os
+import sys
 
 from pynamodb.attributes import UnicodeAttribute, BooleanAttribute, JSONAttribute, UTCDateTimeAttribute
 from pynamodb.indexes import KeysOnlyProjection, GlobalSecondaryIndex
@@ -42,6 +43,7 @@ class OrganizationModel(Model):
 # Read input parameters
 # =======================================================================
 os.chdir(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.realpath('../..'))
 
 PREFIX = 'caring-fred'
 
@@ -50,8 +52,17 @@ parser.add_argument('-r', '--region', required=True,
                     help='AWS CLI region to use')
 parser.add_argument('-s', '--stage',
                     help='Stage name or environment such as dev, stage, uat, etc.', required=True)
+parser.add_argument('--segments', type=int, default=4,
+                    help='Number of segments the organization table is scanned in')
+parser.add_argument('--workers', type=int,
+                    help='Maximum number of segments scanned at the same time')
 args = parser.parse_args()
 
+# The core models read the region when they are imported
+os.environ['AWS_REGION'] = args.region
+
+from core.db import parallel_scan  # noqa: E402
+
 # =======================================================================
 # Initialize boto3
 # =======================================================================
@@ -64,7 +75,7 @@ organization_table_name = '{}-{}-organization'.format(PREFIX, stage)
 OrganizationModel.Meta.table_name = organization_table_name
 
 # Update each record to set the display name
-organization_list = OrganizationModel.scan()
+organization_list = parallel_scan(OrganizationModel, total_segments=args.segments, max_workers=args.workers)
 for organization in organization_list:
     if not organization.search_name:
         organization_name = organization.name
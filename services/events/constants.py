@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum, unique
 
 EVENT_DATE_FORMAT = '%Y-%m-%d'
@@ -5,6 +6,25 @@ EVENT_TIME_FORMAT = '%H:%M:%S'
 MIN_RECURRENCE = 1
 MAX_RECURRENCE = 10
 
+# End date of the events recurring without end
+OPEN_ENDED_DATE = datetime(9999, 12, 31)
+
+# Number of weeks ahead the occurrences of the rule based events are indexed in week buckets, and the number of weeks
+# they are indexed beyond, so the listings keep relying on the buckets when the extension of the index is late
+INDEX_HORIZON_WEEKS = 12
+INDEX_EXTENSION_WEEKS = 2
+
+# Index bucket of the rule based events with occurrences after the weeks they are indexed in
+HORIZON_BUCKET = 'horizon'
+
+# Maximum number of events created by a bulk creation request
+MAX_BULK_EVENTS = 500
+
+# Number of events read per page by a bulk deletion, and the time after which it stops and returns the cursor it
+# resumes from (the function times out after 6 seconds, see serverless.yml)
+BULK_DELETE_PAGE_SIZE = 100
+BULK_DELETE_TIME_LIMIT = 4
+
 
 @unique
 class RecurrenceType(Enum):
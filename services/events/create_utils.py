@@ -1,16 +1,20 @@
-from dateutil.relativedelta import relativedelta, MO, TU, WE, TH, FR, SA, SU
+import logging
+import uuid
 
 from core import errors
-from core.db import save_with_unique_id
+from core.db import batch_save, save_with_unique_id
 from core.db.events.model import EventModel
+from services.events import constants
+from services.events.index import remove_events_from_db, save_events_index
+from services.events.listing_cache import invalidate_listings
+from services.events.recurrence import get_last_occurrence, get_occurrences, is_open_ended
+
+logger = logging.getLogger(__name__)
 
 
 # -------------------------
 # Event creation
 # -------------------------
-from services.events import constants
-
-
 def create_event(**event_args):
     # Set the number of occurrences
     set_occurrences(event_args)
@@ -19,9 +23,55 @@ def create_event(**event_args):
     event = EventModel(**event_args)
     save_with_unique_id(event)
 
+    # An event missing from the index would not be listed, it is removed with the entries written for it
+    if save_events_index([event]):
+        logger.error('Unable to index the event %s, removing it', event.id)
+        if remove_events_from_db([event]):
+            logger.error('Unable to remove the unindexed event %s', event.id)
+
+        raise errors.HttpError(message='Unable to save the event')
+
+    invalidate_listings(event.owner)
+
     return event
 
 
+def build_event(**event_args):
+    """
+    Returns a new event with its identifier and occurrences set, to be saved with create_events
+    """
+    set_occurrences(event_args)
+
+    return EventModel(id=str(uuid.uuid4()), **event_args)
+
+
+def create_events(events):
+    """
+    Save new events and their index entries with batched writes
+    :param events: The events to be saved (see build_event)
+    :return: The list of the events which could not be saved, including the events which could not be indexed
+    """
+    unsaved_events = batch_save(EventModel, events)
+    unsaved_ids = {event.id for event in unsaved_events}
+    saved_events = [event for event in events if event.id not in unsaved_ids]
+
+    # The events missing from the index would not be listed, they are removed with the entries written for them
+    unindexed_ids = {entry.event_id for entry in save_events_index(saved_events)}
+    if unindexed_ids:
+        logger.error('Unable to index the events %s, removing them', sorted(unindexed_ids))
+        unindexed_events = [event for event in saved_events if event.id in unindexed_ids]
+        undeleted_events = remove_events_from_db(unindexed_events)
+        if undeleted_events:
+            logger.error('Unable to remove the unindexed events %s', sorted(event.id for event in undeleted_events))
+
+        unsaved_events = unsaved_events + unindexed_events
+
+    for owner in {event.owner for event in saved_events}:
+        invalidate_listings(owner)
+
+    return unsaved_events
+
+
 # -------------------------
 # Set occurrences on save
 # -------------------------
@@ -32,9 +82,13 @@ def set_occurrences(event_args):
         if recurrence_details is None:
             message = 'Missing data for required field when is_recurring is true'
             raise errors.ResourceValidationError(messages={'recurrence_details': [message]})
-    else:
-        event_args['recurrence_details'] = None
-        recurrence_details = set_default_recurrence_details()
+
+        # Recurring events store their recurrence rule, their occurrences are expanded on read
+        set_occurrence_rule(event_args, recurrence_details)
+        return
+
+    event_args['recurrence_details'] = None
+    recurrence_details = set_default_recurrence_details()
 
     # Populate the occurrences list and last end date
     last_end_date, occurrences = populate_occurrences(event_args['start_date'],
@@ -45,6 +99,36 @@ def set_occurrences(event_args):
     event_args['occurrences'] = occurrences
 
 
+def set_occurrence_rule(event_args, recurrence_details):
+    """
+    Sets a recurring event to be stored with its recurrence rule instead of the list of its occurrences
+
+    The end date of the event is the end of its last occurrence, or the open ended date for the rules which never
+    end, and the end date of its first occurrence is kept to expand the occurrences from the rule
+    """
+    occurrence_type = recurrence_details['occurrence_type']
+    validate_occurrence_type(occurrence_type)
+    if occurrence_type == constants.OccurrenceType.ON.value and recurrence_details.get('on_end_date') is None:
+        message = 'Missing data for required field when occurrence_type is {}'.format(occurrence_type)
+        raise errors.ResourceValidationError(messages={'on_end_date': [message]})
+
+    if is_open_ended(recurrence_details):
+        last_end_date = constants.OPEN_ENDED_DATE
+    else:
+        # The last occurrence is computed from the rule, the occurrences before it are not generated
+        last_occurrence = get_last_occurrence(event_args['start_date'], event_args['end_date'], recurrence_details)
+        if last_occurrence is None:
+            message = 'The recurrence has no occurrence'
+            raise errors.ResourceValidationError(messages={'recurrence_details': [message]})
+
+        _, _, last_end_date = last_occurrence
+
+    event_args['is_rule_based'] = True
+    event_args['first_end_date'] = event_args['end_date']
+    event_args['end_date'] = last_end_date
+    event_args['occurrences'] = []
+
+
 def set_default_recurrence_details():
     return {
         'recurrence': constants.RecurrenceType.DAILY.value,
@@ -55,102 +139,27 @@ def set_default_recurrence_details():
 
 def populate_occurrences(start_date, end_date, recurrence_details):
     occurrence_type = recurrence_details['occurrence_type']
+    validate_occurrence_type(occurrence_type)
 
     if occurrence_type == constants.OccurrenceType.NEVER.value:
-        last_end_date, occurrences = generate_occurrence_type_never_events(start_date, end_date, recurrence_details)
+        # The never ending series stored as a list of occurrences are limited to the maximum number of recurrences
+        recurrence_details = dict(recurrence_details, occurrence_type=constants.OccurrenceType.AFTER.value,
+                                  num_recurrences=constants.MAX_RECURRENCE)
 
-    elif occurrence_type == constants.OccurrenceType.AFTER.value:
-        last_end_date, occurrences = generate_occurrence_type_after_events(start_date, end_date, recurrence_details)
+    # The occurrences are shared with the other events of the same dates and recurrence, the entries are not
+    occurrences = get_occurrences(start_date, end_date, recurrence_details)
+    if not occurrences:
+        message = 'The recurrence has no occurrence'
+        raise errors.ResourceValidationError(messages={'recurrence_details': [message]})
 
-    elif occurrence_type == constants.OccurrenceType.ON.value:
-        last_end_date, occurrences = generate_occurrence_type_on_events(start_date, end_date, recurrence_details)
+    return occurrences[-1][2], [get_occurrence_entry(*occurrence) for occurrence in occurrences]
 
-    else:
+
+def validate_occurrence_type(occurrence_type):
+    if not constants.OccurrenceType.has_value(occurrence_type):
         message = 'Invalid value, must be one of {}'.format(constants.OccurrenceType.values())
         raise errors.ResourceValidationError(messages={'occurrence_type': [message]})
 
-    return last_end_date, occurrences
-
-
-def generate_occurrence_type_never_events(start_date, end_date, recurrence_details):
-    # TODO: Remove limitation when data model allows for occurrences to never end
-    recurrence_details['num_recurrences'] = constants.MAX_RECURRENCE
-
-    return generate_occurrence_type_after_events(start_date, end_date, recurrence_details)
-
-
-def generate_occurrence_type_after_events(start_date, end_date, recurrence_details):
-    occurrences = []
-
-    day_of_week, week_of_month, separation_count = get_relative_interval_details(recurrence_details)
-
-    if day_of_week and week_of_month:
-        for occurrence_num in range(recurrence_details['num_recurrences']):
-            curr_start_date, curr_end_date = set_relative_occurrence_date(start_date,
-                                                                          end_date,
-                                                                          day_of_week,
-                                                                          week_of_month,
-                                                                          occurrence_num * separation_count)
-
-            occurrences.append(get_occurrence_entry(occurrence_num + 1, curr_start_date, curr_end_date))
-
-    else:
-        # Check to see if the event begins on the 28th of February
-        # is_start_end_february = is_event_start_end_february(start_date)
-
-        day_separation, week_separation, month_separation = define_interval_increments(recurrence_details['recurrence'])
-        for occurrence_num in range(recurrence_details['num_recurrences']):
-            curr_start_date, curr_end_date = set_absolute_occurrence_date(start_date,
-                                                                          end_date,
-                                                                          occurrence_num * day_separation,
-                                                                          occurrence_num * week_separation,
-                                                                          occurrence_num * month_separation)
-
-            occurrences.append(get_occurrence_entry(occurrence_num + 1, curr_start_date, curr_end_date))
-
-    return curr_end_date, occurrences
-
-
-def generate_occurrence_type_on_events(start_date, end_date, recurrence_details):
-    # TODO: Determine the number of occurrences between the start_date and the specified occurrence end date?
-    occurrences = []
-
-    on_end_date = recurrence_details.get('on_end_date')
-    day_of_week, week_of_month, separation_count = get_relative_interval_details(recurrence_details)
-
-    occurrence_num = 0
-
-    if day_of_week and week_of_month:
-        while curr_start_date < on_end_date:
-            curr_start_date, curr_end_date = set_relative_occurrence_date(start_date,
-                                                                          end_date,
-                                                                          day_of_week,
-                                                                          week_of_month,
-                                                                          occurrence_num * separation_count)
-
-            occurrences.append(get_occurrence_entry(occurrence_num + 1, curr_start_date, curr_end_date))
-
-    else:
-        # Check to see if the event begins on the 28th of February
-        # is_start_end_february = is_event_start_end_february(start_date)
-
-        day_separation, week_separation, month_separation = define_interval_increments(recurrence_details['recurrence'])
-
-        while curr_start_date < on_end_date:
-            curr_start_date, curr_end_date = set_absolute_occurrence_date(start_date,
-                                                                          end_date,
-                                                                          occurrence_num * day_separation,
-                                                                          occurrence_num * week_separation,
-                                                                          occurrence_num * month_separation)
-
-            occurrences.append(get_occurrence_entry(occurrence_num + 1, curr_start_date, curr_end_date))
-
-    return curr_end_date, occurrences
-
-
-# def is_event_start_end_february(start_date):
-#     return start_date.month == 2 and start_date.day == 28
-
 
 def get_occurrence_entry(occurrence_num, start_date, end_date):
     return {
@@ -158,114 +167,3 @@ def get_occurrence_entry(occurrence_num, start_date, end_date):
         'start_date': start_date,
         'end_date': end_date
     }
-
-
-# ------------------------------------
-# Absolute Event Interval Functions
-# ------------------------------------
-def base_daily_interval():
-    return 1, 0, 0
-
-
-def base_weekly_interval():
-    return 0, 1, 0
-
-
-def base_bi_weekly_interval():
-    return 0, 2, 0
-
-
-def base_monthly_interval():
-    return 0, 0, 1
-
-
-def define_interval_increments(recurrence):
-    switcher = {
-        constants.RecurrenceType.DAILY.value: base_daily_interval(),
-        constants.RecurrenceType.WEEKLY.value: base_weekly_interval(),
-        constants.RecurrenceType.BI_WEEKLY.value: base_bi_weekly_interval(),
-        constants.RecurrenceType.MONTHLY.value: base_monthly_interval()
-    }
-
-    # Get the function from switcher dictionary
-    return switcher.get(recurrence, lambda: "Invalid Interval Value")
-
-
-# ------------------------------------
-# Relative Event Interval Functions
-# ------------------------------------
-def get_relative_interval_details(recurrence_details):
-    return recurrence_details.get('day_of_week'), \
-           recurrence_details.get('week_of_month'), \
-           recurrence_details.get('separation_count')
-
-
-def set_absolute_occurrence_date(start_date, end_date, day_separation, week_separation, month_separation):
-    """
-    Sets the absolute date intervals for DAILY, WEEKLY, BI_WEEKLY, and MONTHLY frequency
-    For example: Every 3rd of the month
-    :param start_date: The current start date
-    :param end_date: The current end date
-    :param day_separation: The number of days between events
-    :param week_separation: The number of weeks between events
-    :param month_separation:  The number of months between events
-    :return:
-    """
-    new_start_date = start_date + relativedelta(day=+day_separation,
-                                                weeks=+week_separation,
-                                                months=+month_separation)
-
-    new_end_date = end_date + relativedelta(day=+day_separation,
-                                            weeks=+week_separation,
-                                            months=+month_separation)
-
-    return new_start_date, new_end_date
-
-
-def set_relative_occurrence_date(start_date, end_date, day_of_week, week_of_month, separation_count):
-    """
-    Sets the relative date interval between events
-
-    :param start_date:
-    :param end_date:
-    :param month_separation:
-    :param day_of_week:
-    :param week_of_month:
-    :param separation_count:
-    :return:
-    # Support for every specific interval
-    # For example: Every month on the 3rd day of the 2nd week
-    """
-    start_end_difference = relativedelta(end_date, start_date)
-    new_start_date = set_next_relative_date(start_date, day_of_week, week_of_month, separation_count)
-    new_end_date = new_start_date + start_end_difference
-
-    return new_start_date, new_end_date
-
-
-def set_next_relative_date(start_date, day_of_week, week_of_month, separation_count):
-    arg = MO(1)
-
-    if day_of_week == 1:
-        arg = MO(week_of_month)
-    if day_of_week == 2:
-        arg = TU(week_of_month)
-    if day_of_week == 3:
-        arg = WE(week_of_month)
-    if day_of_week == 4:
-        arg = TH(week_of_month)
-    if day_of_week == 5:
-        arg = FR(week_of_month)
-    if day_of_week == 6:
-        arg = SA(week_of_month)
-    if day_of_week == 7:
-        arg = SU(week_of_month)
-
-    if week_of_month == -1:
-        return start_date + relativedelta(day=31,
-                                          months=+separation_count,
-                                          weekday=arg)
-
-    return start_date + relativedelta(day=1,
-                                      months=+separation_count,
-                                      weekday=arg)
@@ -0,0 +1,57 @@
+import time
+
+from core.db import decode_cursor, encode_cursor
+from core.db.events import get_events_by_owner
+from core.db.events.model import EventModel
+from services.events import constants
+from services.events.index import remove_events_from_db
+from services.events.listing_cache import invalidate_listings
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Attributes read for the deleted events: their keys and the attributes their index entries depend on
+event_delete_attributes = sorted(EventModel.get_attributes()[name].attr_name
+                                 for name in ('id', 'owner', 'start_date', 'end_date', 'first_end_date',
+                                              'is_rule_based', 'recurrence_details', 'occurrences', 'categories'))
+
+
+# -------------------------
+# Event bulk deletion
+# -------------------------
+def delete_events(owner, start_date=None, end_date=None, category_filters=None, cursor=None,
+                  time_limit=constants.BULK_DELETE_TIME_LIMIT):
+    """
+    Delete the events of an owner page by page, until they are all deleted or the time limit is reached
+    :param owner: The owner of the events
+    :param start_date: If set, only the events ending after this date are deleted
+    :param end_date: If set, only the events starting before this date are deleted
+    :param category_filters: If set, only the events with one of these categories are deleted
+    :param cursor: The cursor returned by the previous call, the deletion starts from the first event if not set
+    :param time_limit: The number of seconds after which no other page is deleted
+    :return: The number of events deleted, the ids of the events which could not be deleted and the cursor the
+    deletion resumes from (None once all the events are deleted)
+    """
+    deadline = time.monotonic() + time_limit
+    last_evaluated_key = decode_cursor(cursor).get('key')
+
+    deleted_count = 0
+    undeleted_ids = []
+    while True:
+        results = get_events_by_owner(owner, start_date, end_date, category_filters, constants.BULK_DELETE_PAGE_SIZE,
+                                      last_evaluated_key, event_delete_attributes)
+        events = list(results)
+
+        undeleted_events = remove_events_from_db(events)
+        deleted_count += len(events) - len(undeleted_events)
+        undeleted_ids.extend(event.id for event in undeleted_events)
+        logger.info('Deleted %s of %s events of owner %s', len(events) - len(undeleted_events), len(events), owner)
+
+        last_evaluated_key = results.last_evaluated_key
+        if not last_evaluated_key or time.monotonic() >= deadline:
+            break
+
+    if deleted_count:
+        invalidate_listings(owner)
+
+    return deleted_count, undeleted_ids, encode_cursor({'key': last_evaluated_key}) if last_evaluated_key else None
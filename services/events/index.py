@@ -0,0 +1,538 @@
+import logging
+
+from datetime import datetime, timedelta
+
+from pynamodb.exceptions import PynamoDBException
+
+from core import db, errors
+from core.db import decode_cursor, encode_cursor, get_page
+from core.db.events import get_event_from_db, get_events_by_keys, get_events_by_owner
+from core.db.events.model import EventBucketModel, EventCategoryModel, EventModel
+from services.events import constants, set_dates_filter, within_date_range
+from services.events.occurrences import get_event_occurrences
+
+logger = logging.getLogger(__name__)
+
+# Number of entries of the horizon bucket read per page by the extension of the index, and the time left to it when
+# it stops reading new pages
+EXTENSION_PAGE_SIZE = 100
+TIME_MARGIN_MILLIS = 15000
+
+
+# -------------------------
+# Event writes
+# -------------------------
+def remove_event_from_db(event_id, owner):
+    event = get_event_from_db(event_id, owner)
+
+    try:
+        # TODO: Soft delete vs hard delete?
+        event.delete()
+    except EventModel.DeleteError:
+        message = 'Unable to delete event {} for owner {}'.format(event_id, owner)
+        raise errors.BadRequestError(messages={'event': [message]})
+
+    remove_event_index(event)
+
+
+def update_event_in_db(event, actions):
+    """
+    Update an event and keep its index entries in sync with the updated occurrences and categories
+    :param event: The event to be updated
+    :param actions: The update actions to apply
+    :return: None
+    """
+    index_keys = get_event_index_keys(event)
+    db.update_item(event, actions)
+    sync_event_index(event, index_keys)
+
+
+def remove_events_from_db(events):
+    """
+    Delete events and their index entries with batched writes
+    :param events: The events to be deleted, read with at least the attributes their index entries depend on
+    :return: The list of the events which could not be deleted
+    """
+    undeleted_events = db.batch_delete(EventModel, events)
+    undeleted_ids = {event.id for event in undeleted_events}
+    deleted_events = [event for event in events if event.id not in undeleted_ids]
+
+    bucket_entries = []
+    category_entries = []
+    for event in deleted_events:
+        buckets, category_buckets = get_event_index_keys(event)
+        bucket_entries.extend(EventBucketModel(bucket, event.id) for bucket in buckets)
+        category_entries.extend(EventCategoryModel(category, get_category_entry_key(bucket, event.id),
+                                                   event_id=event.id)
+                                for category, bucket in category_buckets)
+
+    undeleted_entries = db.batch_delete(EventBucketModel, bucket_entries) + \
+        db.batch_delete(EventCategoryModel, category_entries)
+    if undeleted_entries:
+        logger.error('Unable to remove the index entries of the events %s',
+                     sorted({entry.event_id for entry in undeleted_entries}))
+
+    return undeleted_events
+
+
+# -------------------------
+# Event week buckets
+# -------------------------
+def get_bucket(date):
+    """
+    Returns the bucket (the Monday starting the week) containing the date
+    """
+    return (date - timedelta(days=date.weekday())).strftime(constants.EVENT_DATE_FORMAT)
+
+
+def get_buckets(start_date, end_date):
+    """
+    Returns the ordered list of buckets overlapping the date range
+    """
+    buckets = []
+
+    bucket_date = start_date - timedelta(days=start_date.weekday())
+    while bucket_date <= end_date:
+        buckets.append(bucket_date.strftime(constants.EVENT_DATE_FORMAT))
+        bucket_date += timedelta(weeks=1)
+
+    return buckets
+
+
+def get_index_horizon(extension_weeks=0):
+    """
+    Returns the date (a Monday) up to which the occurrences of the rule based events are indexed in week buckets
+
+    The horizon moves with the current week: the listings rely on the buckets before it, the index is written
+    extension_weeks further and extended as the weeks pass (see extend_events_index)
+    """
+    today = datetime.today()
+    week_start = datetime(today.year, today.month, today.day) - timedelta(days=today.weekday())
+
+    return week_start + timedelta(weeks=constants.INDEX_HORIZON_WEEKS + extension_weeks)
+
+
+def get_event_buckets(event, horizon):
+    """
+    Returns the buckets an event is indexed in
+
+    The occurrences of the rule based events, which may never end, are indexed in the buckets before the horizon
+    only; the events with occurrences after it are also indexed in the horizon bucket, listed along the buckets of
+    the date ranges reaching the horizon
+    """
+    buckets = set()
+
+    if not event.is_rule_based:
+        for occurrence in event.occurrences:
+            buckets.update(get_buckets(occurrence['start_date'], occurrence['end_date']))
+
+        return buckets
+
+    horizon_bucket = get_bucket(horizon)
+    for occurrence in get_event_occurrences(event, datetime.min, horizon - timedelta(microseconds=1)):
+        buckets.update(bucket for bucket in get_buckets(occurrence['start_date'], occurrence['end_date'])
+                       if bucket < horizon_bucket)
+
+    if event.end_date >= horizon:
+        buckets.add(constants.HORIZON_BUCKET)
+
+    return buckets
+
+
+# -------------------------
+# Event index maintenance
+# -------------------------
+def get_category_entry_key(bucket, event_id):
+    return '{}#{}'.format(bucket, event_id)
+
+
+def get_event_index_keys(event, horizon=None):
+    """
+    Returns the buckets and the (category, bucket) pairs an event is indexed in, for its non empty categories
+    :param horizon: The date the event is indexed up to. If not set, the keys of all the entries the event may have
+    been written in since its creation are returned, to remove them.
+    :return: The buckets and the (category, bucket) pairs
+    """
+    if horizon is None:
+        buckets = get_event_buckets(event, get_index_horizon(constants.INDEX_EXTENSION_WEEKS))
+        if event.is_rule_based:
+            buckets.add(constants.HORIZON_BUCKET)
+    else:
+        buckets = get_event_buckets(event, horizon)
+
+    category_buckets = {(category, bucket) for category in set(event.categories or []) if category
+                        for bucket in buckets}
+
+    return buckets, category_buckets
+
+
+def get_bucket_entry(event, bucket, horizon):
+    indexed_until = get_bucket(horizon) if bucket == constants.HORIZON_BUCKET else None
+
+    return EventBucketModel(bucket, event.id, owner=event.owner, indexed_until=indexed_until)
+
+
+def get_category_entry(event, category, bucket, horizon):
+    indexed_until = get_bucket(horizon) if bucket == constants.HORIZON_BUCKET else None
+
+    return EventCategoryModel(category, get_category_entry_key(bucket, event.id), bucket=bucket, event_id=event.id,
+                              owner=event.owner, indexed_until=indexed_until)
+
+
+def save_event_index(event):
+    sync_event_index(event, (set(), set()))
+
+
+def save_events_index(events):
+    """
+    Write the index entries of new events with batched writes
+    :param events: The events whose entries are written
+    :return: The list of the entries which could not be written
+    """
+    horizon = get_index_horizon(constants.INDEX_EXTENSION_WEEKS)
+    bucket_entries = []
+    category_entries = []
+
+    for event in events:
+        buckets, category_buckets = get_event_index_keys(event, horizon)
+        bucket_entries.extend(get_bucket_entry(event, bucket, horizon) for bucket in buckets)
+        category_entries.extend(get_category_entry(event, category, bucket, horizon)
+                                for category, bucket in category_buckets)
+
+    return db.batch_save(EventBucketModel, bucket_entries) + db.batch_save(EventCategoryModel, category_entries)
+
+
+def remove_event_index(event):
+    buckets, category_buckets = get_event_index_keys(event)
+
+    with EventBucketModel.batch_write() as batch:
+        for bucket in buckets:
+            batch.delete(EventBucketModel(bucket, event.id))
+
+    with EventCategoryModel.batch_write() as batch:
+        for category, bucket in category_buckets:
+            batch.delete(EventCategoryModel(category, get_category_entry_key(bucket, event.id)))
+
+
+def sync_event_index(event, previous_keys, horizon=None):
+    """
+    Write the index entries of an event, removing the entries it is no longer indexed in
+
+    The entries of the horizon bucket are always written, as the horizon they hold moves
+    :param event: The event whose entries are written
+    :param previous_keys: The buckets and (category, bucket) pairs the event was indexed in before the change
+    :param horizon: The date the event is indexed up to, the current horizon of the index if not set
+    :return: None
+    """
+    horizon = horizon or get_index_horizon(constants.INDEX_EXTENSION_WEEKS)
+    buckets, category_buckets = get_event_index_keys(event, horizon)
+    previous_buckets, previous_category_buckets = previous_keys
+
+    with EventBucketModel.batch_write() as batch:
+        for bucket in previous_buckets - buckets:
+            batch.delete(EventBucketModel(bucket, event.id))
+
+        for bucket in buckets - (previous_buckets - {constants.HORIZON_BUCKET}):
+            batch.save(get_bucket_entry(event, bucket, horizon))
+
+    with EventCategoryModel.batch_write() as batch:
+        for category, bucket in previous_category_buckets - category_buckets:
+            batch.delete(EventCategoryModel(category, get_category_entry_key(bucket, event.id)))
+
+        previous_category_buckets = {(category, bucket) for category, bucket in previous_category_buckets
+                                     if bucket != constants.HORIZON_BUCKET}
+        for category, bucket in category_buckets - previous_category_buckets:
+            batch.save(get_category_entry(event, category, bucket, horizon))
+
+
+def extend_events_index(get_remaining_time_in_millis=None):
+    """
+    Index the occurrences of the rule based events up to the current horizon, page by page of the horizon bucket
+    until all the events are indexed or the time is running out
+
+    The events with no occurrence after the horizon left are removed from the horizon bucket, and the entries of
+    the events which no longer exist are removed
+    :param get_remaining_time_in_millis: If set, the function returning the time left to the worker
+    :return: The number of events extended and the number of events which could not be extended
+    """
+    horizon = get_index_horizon(constants.INDEX_EXTENSION_WEEKS)
+    filter_condition = EventBucketModel.indexed_until < get_bucket(horizon)
+    counts = {'extended': 0, 'failed': 0}
+
+    last_evaluated_key = None
+    while get_remaining_time_in_millis is None or get_remaining_time_in_millis() > TIME_MARGIN_MILLIS:
+        results = EventBucketModel.query(constants.HORIZON_BUCKET, filter_condition=filter_condition,
+                                         limit=EXTENSION_PAGE_SIZE, last_evaluated_key=last_evaluated_key)
+        entries = {(entry.event_id, entry.owner): entry for entry in results}
+        last_evaluated_key = results.last_evaluated_key
+
+        events = {(event.id, event.owner): event for event in get_events_by_keys(list(entries))}
+        for key, entry in entries.items():
+            if extend_event_index(events.get(key), entry, horizon):
+                counts['extended'] += 1
+            else:
+                counts['failed'] += 1
+
+        if not last_evaluated_key:
+            break
+
+    logger.info('Event index extended: %(extended)s extended, %(failed)s failed', counts)
+    return counts
+
+
+def extend_event_index(event, entry, horizon):
+    """
+    Index the occurrences of an event of the horizon bucket up to the horizon, returning whether they were indexed
+    """
+    try:
+        if event is None:
+            # The event was removed but not its entry of the horizon bucket
+            entry.delete()
+            return True
+
+        indexed_until = datetime.strptime(entry.indexed_until, constants.EVENT_DATE_FORMAT)
+        sync_event_index(event, get_event_index_keys(event, indexed_until), horizon)
+    except PynamoDBException as e:
+        logger.error('Unable to extend the index of the event {}: {}'.format(entry.event_id, str(e)))
+        return False
+
+    return True
+
+
+# -------------------------
+# Event index queries
+# -------------------------
+def query_bucket_entries(bucket, limit=None, last_evaluated_key=None):
+    """
+    Returns the entries of the events having an occurrence in the bucket
+    """
+    return EventBucketModel.query(bucket, limit=limit, last_evaluated_key=last_evaluated_key)
+
+
+def query_category_entries(category, start_date, end_date, limit=None, last_evaluated_key=None):
+    """
+    Returns the entries of the events of the category having an occurrence in the buckets overlapping the date range
+    """
+    range_key_condition = EventCategoryModel.bucket_event_id.between(
+        get_category_entry_key(get_bucket(start_date), ''),
+        get_category_entry_key(get_bucket(end_date), '~'))
+
+    return EventCategoryModel.query(category, range_key_condition,
+                                    limit=limit,
+                                    last_evaluated_key=last_evaluated_key)
+
+
+def query_horizon_category_entries(category, limit=None, last_evaluated_key=None):
+    """
+    Returns the entries of the events of the category with occurrences after the weeks they are indexed in
+    """
+    range_key_condition = EventCategoryModel.bucket_event_id.startswith(
+        get_category_entry_key(constants.HORIZON_BUCKET, ''))
+
+    return EventCategoryModel.query(category, range_key_condition,
+                                    limit=limit,
+                                    last_evaluated_key=last_evaluated_key)
+
+
+# -------------------------
+# Event retrieval actions
+# -------------------------
+def get_events_in_date_range(start_date, end_date, org_id=None, category_filters=None, attributes_to_get=None):
+    """
+    Returns the events with occurrences in the date range
+
+    The events of an organization are queried by owner; otherwise the category index (when filtering on
+    categories) or the week buckets are queried for the buckets overlapping the date range
+    :param start_date: The start of the date range
+    :param end_date: The end of the date range
+    :param org_id: If set, only the events of this organization are returned
+    :param category_filters: If set, only the events with one of these categories are returned
+    :param attributes_to_get: If set, only these attributes of the events are read
+    :return: Iterator of the matching events
+    """
+    if org_id is not None:
+        return get_events_by_owner(org_id, start_date, end_date, category_filters,
+                                   attributes_to_get=attributes_to_get)
+
+    return get_indexed_events_in_date_range(start_date, end_date, category_filters, attributes_to_get)
+
+
+def get_indexed_events_in_date_range(start_date, end_date, category_filters, attributes_to_get=None):
+    partitions, query_partition, is_listed_in = get_event_index(start_date, end_date, category_filters)
+
+    read_events = {}
+    for partition in partitions:
+        yield from get_entries_events(query_partition(partition), partition, is_listed_in, start_date, end_date,
+                                      attributes_to_get, read_events)
+
+
+def get_events_page_in_date_range(start_date, end_date, org_id, limit, cursor, category_filters=None,
+                                  attributes_to_get=None):
+    """
+    Returns one page of the events with occurrences in the date range
+    :param start_date: The start of the date range (see set_page_dates_filter)
+    :param end_date: The end of the date range
+    :param org_id: If set, only the events of this organization are returned
+    :param limit: The maximum number of events of the page
+    :param cursor: The cursor of the page, the first page is returned if not set
+    :param category_filters: If set, only the events with one of these categories are returned
+    :param attributes_to_get: If set, only these attributes of the events are read
+    :return: The events of the page and the cursor of the next page (None on the last page)
+    """
+    position = decode_cursor(cursor)
+
+    if org_id is not None:
+        return get_page(get_events_by_owner(org_id, start_date, end_date, category_filters, limit,
+                                            position.get('key'), attributes_to_get),
+                        dates=get_page_dates(start_date, end_date))
+
+    return get_indexed_events_page_in_date_range(start_date, end_date, category_filters, limit, position,
+                                                 attributes_to_get)
+
+
+def set_page_dates_filter(start_date, end_date, cursor):
+    """
+    Returns the date range of a page of events: the range stored in the cursor of the page when one is set, so the
+    following pages keep the range of the first one (the default range moves with the current date)
+    """
+    filter_start_date, filter_end_date = set_dates_filter(start_date, end_date)
+
+    dates = decode_cursor(cursor).get('dates')
+    if dates is None:
+        return filter_start_date, filter_end_date
+
+    try:
+        page_start_date, page_end_date = (datetime.fromisoformat(date) for date in dates)
+    except (TypeError, ValueError):
+        raise errors.BadRequestError(messages={'cursor': ['Invalid cursor']})
+
+    if (start_date or end_date) and (page_start_date, page_end_date) != (filter_start_date, filter_end_date):
+        raise errors.BadRequestError(messages={'cursor': ['Cursor does not match the filters']})
+
+    return page_start_date, page_end_date
+
+
+def get_page_dates(start_date, end_date):
+    return [start_date.isoformat(), end_date.isoformat()]
+
+
+def get_indexed_events_page_in_date_range(start_date, end_date, category_filters, limit, position,
+                                          attributes_to_get=None):
+    """
+    Returns one page of the events from the event index
+
+    The partitions are read until the page holds limit events, as the entries of the events indexed several times
+    or listed from another partition are skipped; its position is the partition being read and the last entry read
+    in it
+    """
+    partitions, query_partition, is_listed_in = get_event_index(start_date, end_date, category_filters)
+    partition = position.get('partition', partitions[0])
+    if partition not in partitions:
+        raise errors.BadRequestError(messages={'cursor': ['Cursor does not match the filters']})
+
+    events = []
+    read_events = {}
+    index = partitions.index(partition)
+    last_evaluated_key = position.get('key')
+    while index < len(partitions) and len(events) < limit:
+        partition = partitions[index]
+        results = query_partition(partition, limit=limit - len(events), last_evaluated_key=last_evaluated_key)
+        entries = list(results)
+        events.extend(get_entries_events(entries, partition, is_listed_in, start_date, end_date, attributes_to_get,
+                                         read_events))
+
+        last_evaluated_key = results.last_evaluated_key
+        if not last_evaluated_key:
+            index += 1
+
+    if index == len(partitions):
+        return events, None
+
+    next_position = {'partition': partitions[index], 'dates': get_page_dates(start_date, end_date)}
+    if last_evaluated_key:
+        next_position['key'] = last_evaluated_key
+
+    return events, encode_cursor(next_position)
+
+
+def get_event_index(start_date, end_date, category_filters):
+    """
+    Returns the index used to list the events in the date range: its ordered partitions, the function
+    querying the entries of a partition and the function checking whether an event is listed from a partition
+
+    The rule based events are indexed in the buckets before the index horizon, the partitions of the horizon bucket
+    follow the partitions of the date ranges reaching it
+    """
+    horizon_buckets = [constants.HORIZON_BUCKET] if end_date >= get_index_horizon() else []
+
+    if category_filters:
+        categories = list(dict.fromkeys(category_filters))
+        partitions = [[category, bucket] for category in categories for bucket in [None] + horizon_buckets]
+
+        def query_partition(partition, **kwargs):
+            category, bucket = partition
+            if bucket is None:
+                return query_category_entries(category, start_date, end_date, **kwargs)
+
+            return query_horizon_category_entries(category, **kwargs)
+
+        def is_listed_in_category(event, partition):
+            category = next((category for category in categories if category in event.categories), None)
+            return category == partition[0]
+
+        return partitions, query_partition, is_listed_in_category
+
+    return get_buckets(start_date, end_date) + horizon_buckets, query_bucket_entries, \
+        lambda event, partition: True
+
+
+def get_entries_events(entries, partition, is_listed_in, start_date, end_date, attributes_to_get=None,
+                       read_events=None):
+    """
+    Returns the events referenced by the entries of an index partition
+
+    An event indexed several times is returned once across all the partitions and pages: from the entry of
+    its first partition for the first bucket in which it has an occurrence within the date range, or from its entry
+    of the horizon bucket when this bucket is after the weeks the event is indexed in
+    :param read_events: If set, the events read for the previous partitions by key, which are not read again. The
+    events returned are set to None, the others are kept for the partitions they are listed from.
+    """
+    entry_buckets = {}
+    for entry in entries:
+        entry_buckets.setdefault((entry.event_id, entry.owner), {})[entry.bucket] = entry
+
+    for event in get_events_by_entry_keys(list(entry_buckets), attributes_to_get, read_events):
+        key = (event.id, event.owner)
+        if not is_listed_in(event, partition):
+            continue
+
+        bucket = get_first_bucket_in_range(event, start_date, end_date)
+        horizon_entry = entry_buckets[key].get(constants.HORIZON_BUCKET)
+        if bucket in entry_buckets[key] or \
+                (bucket is not None and horizon_entry is not None and bucket >= horizon_entry.indexed_until):
+            if read_events is not None:
+                read_events[key] = None
+            yield event
+
+
+def get_events_by_entry_keys(keys, attributes_to_get=None, read_events=None):
+    """
+    Returns the events of the (event id, owner) keys, reading only the keys not in the events already read
+    """
+    if read_events is None:
+        return get_events_by_keys(keys, attributes_to_get)
+
+    new_keys = [key for key in keys if key not in read_events]
+    if new_keys:
+        read_events.update(dict.fromkeys(new_keys))
+        for event in get_events_by_keys(new_keys, attributes_to_get):
+            read_events[(event.id, event.owner)] = event
+
+    return [read_events[key] for key in keys if read_events[key] is not None]
+
+
+def get_first_bucket_in_range(event, start_date, end_date):
+    occurrences = (occurrence for occurrence in get_event_occurrences(event, start_date, end_date)
+                   if within_date_range(occurrence, start_date, end_date))
+
+    return min((get_bucket(max(occurrence.start_date, start_date)) for occurrence in occurrences), default=None)
@@ -0,0 +1,30 @@
+from core.cache import Cache
+
+# Namespace of the listings of the events of every organization
+ALL_EVENTS = '*'
+
+listing_cache = Cache('event-listings')
+
+
+def get_cached_listing(org_id, start_date, end_date, category_filters, load):
+    """
+    Returns the cached listing of the events of the filters, loading it on a miss
+    :param org_id: The organization of the events (None for every organization)
+    :param start_date: The start of the date range
+    :param end_date: The end of the date range
+    :param category_filters: The categories of the events
+    :param load: Function returning the ETag and the serialized listing
+    :return: The ETag and the serialized listing
+    """
+    key = (start_date.isoformat(), end_date.isoformat(), tuple(sorted(set(category_filters))))
+    listing = listing_cache.get_or_set(org_id or ALL_EVENTS, key, load)
+    listing_cache.log_metrics()
+
+    return listing
+
+
+def invalidate_listings(owner):
+    """
+    Invalidate the cached listings including the events of the owner
+    """
+    listing_cache.invalidate(owner, ALL_EVENTS)
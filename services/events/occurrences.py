@@ -0,0 +1,119 @@
+from collections import ChainMap
+
+from core.db.events.model import EventModel, OccurrenceDetail
+from services.events import contains_category, within_date_range
+from services.events.recurrence import get_occurrence_dates, is_open_ended, iter_occurrence_dates, \
+    iter_occurrence_dates_in_range
+
+
+class EventOccurrence:
+    """
+    Read-only view of a single occurrence of an event
+
+    Only the occurrence number and dates are held by the view, any other attribute is read from the event
+    """
+    __slots__ = ('event', 'occurrence_num', 'start_date', 'end_date')
+
+    def __init__(self, event, occurrence):
+        object.__setattr__(self, 'event', event)
+        object.__setattr__(self, 'occurrence_num', occurrence.occurrence_num)
+        object.__setattr__(self, 'start_date', occurrence.start_date)
+        object.__setattr__(self, 'end_date', occurrence.end_date)
+
+    def __getattr__(self, name):
+        return getattr(self.event, name)
+
+    @classmethod
+    def get_attributes(cls):
+        """
+        Returns the attributes read from the event, for the serializers reading the attribute values directly
+        """
+        return {name: attribute for name, attribute in EventModel.get_attributes().items()
+                if name not in cls.__slots__}
+
+    @property
+    def attribute_values(self):
+        """
+        The attribute values of the event, with the occurrence number and dates of the occurrence
+        """
+        return ChainMap({'occurrence_num': self.occurrence_num, 'start_date': self.start_date,
+                         'end_date': self.end_date}, self.event.attribute_values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Event occurrences are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('Event occurrences are read-only')
+
+
+def get_event_occurrence(event, occurrence_num):
+    if occurrence_num is None or occurrence_num < 1:
+        return None
+
+    if event.is_rule_based:
+        occurrence_dates = get_occurrence_dates(event.start_date, event.first_end_date, event.recurrence_details,
+                                                occurrence_num)
+        if occurrence_dates is None:
+            return None
+
+        occurrence = get_occurrence_detail(occurrence_num, *occurrence_dates)
+    else:
+        occurrence = next((x for x in event.occurrences if x.occurrence_num == occurrence_num), None)
+
+    return get_recurring_event(event, occurrence) if occurrence else None
+
+
+# -------------------------
+# Expand occurrences on read
+# -------------------------
+def is_open_ended_event(event):
+    return bool(event.is_rule_based) and is_open_ended(event.recurrence_details)
+
+
+def get_event_occurrences(event, start_date=None, end_date=None):
+    """
+    Returns the occurrences of an event
+
+    The occurrences of the events stored with their recurrence rule are expanded from the rule, lazily and only
+    from the first occurrence in the date range up to its end when one is given (endlessly for the rules which
+    never end otherwise)
+    :param event: The event whose occurrences are returned
+    :param start_date: If set with the end date, the occurrences ending before this date may be skipped
+    :param end_date: If set with the start date, the occurrences starting after this date are not returned
+    :return: Iterable of the occurrences of the event, in order of their start dates
+    """
+    if not event.is_rule_based:
+        return event.occurrences
+
+    if start_date is None or end_date is None:
+        occurrence_dates = iter_occurrence_dates(event.start_date, event.first_end_date, event.recurrence_details)
+    else:
+        occurrence_dates = iter_occurrence_dates_in_range(event.start_date, event.first_end_date,
+                                                          event.recurrence_details, start_date, end_date)
+
+    return (get_occurrence_detail(*occurrence) for occurrence in occurrence_dates)
+
+
+def get_occurrence_detail(occurrence_num, start_date, end_date):
+    return OccurrenceDetail(occurrence_num=occurrence_num, start_date=start_date, end_date=end_date)
+
+
+# -------------------------
+# List occurrences on read
+# -------------------------
+def get_events_occurrences(events, start_date, end_date, category_filters):
+    for event in events:
+        yield from get_recurring_events_list(event, start_date, end_date, category_filters)
+
+
+def get_recurring_events_list(event, start_date, end_date, category_filters):
+    if not contains_category(event.categories, category_filters):
+        return []
+
+    return [get_recurring_event(event, occurrence)
+            for occurrence in get_event_occurrences(event, start_date, end_date)
+            if within_date_range(occurrence, start_date, end_date)]
+
+
+def get_recurring_event(event, occurrence):
+    return EventOccurrence(event, occurrence)
@@ -0,0 +1,391 @@
+import functools
+
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta, MO, TU, WE, TH, FR, SA, SU
+
+from services.events import constants
+
+# Number of occurrence lists kept for the recurrence rules generated again and again, as in bulk creations, and the
+# number of occurrences of the rules kept, which bounds the size of the cache to their product
+OCCURRENCES_CACHE_SIZE = 1024
+OCCURRENCES_CACHE_MAX_OCCURRENCES = 100
+
+# Values of a recurrence rule its occurrences depend on, in the order of the rule keys (see get_rule_key)
+RULE_KEY_NAMES = ('recurrence', 'occurrence_type', 'num_recurrences', 'on_end_date', 'day_of_week', 'week_of_month',
+                  'separation_count')
+
+
+# -------------------------
+# Recurrence rules
+# -------------------------
+def get_rule_value(recurrence_details, name):
+    """
+    Returns a value of the recurrence details, as given on creation (dict) or loaded (map attribute)
+    """
+    if isinstance(recurrence_details, dict):
+        return recurrence_details.get(name)
+
+    return getattr(recurrence_details, name, None)
+
+
+def is_open_ended(recurrence_details):
+    return get_rule_value(recurrence_details, 'occurrence_type') == constants.OccurrenceType.NEVER.value
+
+
+def get_rule_key(recurrence_details):
+    """
+    Returns the values of a recurrence rule its occurrences depend on, as a hashable key
+
+    The values a rule does not use (the end condition of the other occurrence types, the relative interval of the
+    absolute rules and the recurrence of the relative ones) are left out, so equivalent rules have the same key
+    """
+    occurrence_type = get_rule_value(recurrence_details, 'occurrence_type')
+    day_of_week, week_of_month, separation_count = get_relative_interval_details(recurrence_details)
+    is_relative = bool(day_of_week and week_of_month)
+
+    return (None if is_relative else get_rule_value(recurrence_details, 'recurrence'),
+            occurrence_type,
+            get_rule_value(recurrence_details, 'num_recurrences')
+            if occurrence_type == constants.OccurrenceType.AFTER.value else None,
+            get_rule_value(recurrence_details, 'on_end_date')
+            if occurrence_type == constants.OccurrenceType.ON.value else None,
+            day_of_week if is_relative else None,
+            week_of_month if is_relative else None,
+            separation_count if is_relative else None)
+
+
+def get_occurrences(start_date, end_date, recurrence_details):
+    """
+    Returns all the occurrences of a recurrence rule which ends, memoized for the rules and dates generated again
+
+    Only the rules with at most OCCURRENCES_CACHE_MAX_OCCURRENCES occurrences are memoized, the others are generated
+    on each call
+    :param start_date: The start date of the first occurrence
+    :param end_date: The end date of the first occurrence
+    :param recurrence_details: The recurrence rule, which must not be a rule which never ends
+    :return: Tuple of the (occurrence number, start date, end date) of the occurrences
+    """
+    if is_open_ended(recurrence_details):
+        raise ValueError('The occurrences of a recurrence which never ends cannot be listed')
+
+    last_occurrence = get_last_occurrence(start_date, end_date, recurrence_details)
+    if last_occurrence is not None and last_occurrence[0] > OCCURRENCES_CACHE_MAX_OCCURRENCES:
+        return tuple(iter_occurrence_dates(start_date, end_date, recurrence_details))
+
+    return get_rule_occurrences(start_date, end_date, get_rule_key(recurrence_details))
+
+
+@functools.lru_cache(maxsize=OCCURRENCES_CACHE_SIZE)
+def get_rule_occurrences(start_date, end_date, rule_key):
+    return tuple(iter_occurrence_dates(start_date, end_date, dict(zip(RULE_KEY_NAMES, rule_key))))
+
+
+def get_occurrences_cache_metrics():
+    cache_info = get_rule_occurrences.cache_info()
+    lookups = cache_info.hits + cache_info.misses
+
+    return {
+        'hits': cache_info.hits,
+        'misses': cache_info.misses,
+        'hit_ratio': cache_info.hits / lookups if lookups else 0.0,
+        'size': cache_info.currsize,
+        'max_size': cache_info.maxsize,
+    }
+
+
+def iter_occurrence_dates(start_date, end_date, recurrence_details, first_index=0):
+    """
+    Generates the occurrences of a recurrence rule, in order of their start dates
+    :param start_date: The start date of the first occurrence
+    :param end_date: The end date of the first occurrence
+    :param recurrence_details: The recurrence rule (recurrence, day and week of month, separation and end condition)
+    :param first_index: The index (from 0) of the first occurrence generated
+    :return: Iterator of the (occurrence number, start date, end date) of the occurrences, endless for the rules
+    which never end. It stops at the first occurrence which does not start after the previous one, so a rule which
+    does not move forward cannot generate the same dates forever.
+    """
+    get_occurrence_dates = get_occurrence_dates_function(start_date, end_date, recurrence_details)
+    is_last_index = get_last_index_function(recurrence_details)
+
+    index = first_index
+    previous_start_date = None
+    while True:
+        occurrence_start_date, occurrence_end_date = get_occurrence_dates(index)
+        if is_last_index(index, occurrence_start_date):
+            return
+        if previous_start_date is not None and occurrence_start_date <= previous_start_date:
+            return
+
+        yield index + 1, occurrence_start_date, occurrence_end_date
+        previous_start_date = occurrence_start_date
+        index += 1
+
+
+def iter_occurrence_dates_in_range(start_date, end_date, recurrence_details, range_start_date, range_end_date):
+    """
+    Generates the occurrences of a recurrence rule overlapping a date range
+
+    The occurrences before the date range are skipped without being generated (see get_first_index_in_range)
+    """
+    first_index = get_first_index_in_range(start_date, end_date, recurrence_details, range_start_date)
+
+    for occurrence in iter_occurrence_dates(start_date, end_date, recurrence_details, first_index):
+        _, occurrence_start_date, occurrence_end_date = occurrence
+        if occurrence_start_date > range_end_date:
+            return
+        if occurrence_end_date >= range_start_date:
+            yield occurrence
+
+
+def get_occurrence_dates(start_date, end_date, recurrence_details, occurrence_num):
+    """
+    Returns the start and end dates of an occurrence of a recurrence rule, or None if the rule has no such occurrence
+    """
+    if occurrence_num < 1:
+        return None
+
+    index = occurrence_num - 1
+    occurrence_start_date, occurrence_end_date = \
+        get_occurrence_dates_function(start_date, end_date, recurrence_details)(index)
+    if get_last_index_function(recurrence_details)(index, occurrence_start_date):
+        return None
+
+    return occurrence_start_date, occurrence_end_date
+
+
+def get_first_index_in_range(start_date, end_date, recurrence_details, range_start_date):
+    """
+    Returns the index (from 0) of the first occurrence of a recurrence rule ending on or after a date
+
+    The index is computed from the number of days or months between the first occurrence and the date, then
+    corrected by the step or two the varying lengths of the months can put it off, instead of generating every
+    occurrence before the date. The end condition of the rule is not checked.
+    """
+    get_occurrence_dates = get_occurrence_dates_function(start_date, end_date, recurrence_details)
+    days, months = get_interval_period(recurrence_details)
+
+    if range_start_date <= end_date:
+        return 0
+
+    if months:
+        elapsed_months = (range_start_date.year - end_date.year) * 12 + range_start_date.month - end_date.month
+        index = elapsed_months // months
+    else:
+        index = (range_start_date - end_date) // timedelta(days=days)
+
+    while index > 0 and get_occurrence_dates(index - 1)[1] >= range_start_date:
+        index -= 1
+    while get_occurrence_dates(index)[1] < range_start_date:
+        index += 1
+
+    return index
+
+
+def get_last_occurrence(start_date, end_date, recurrence_details):
+    """
+    Returns the last occurrence of a recurrence rule which ends, or None if the rule has no occurrence
+
+    The index of the occurrence is computed from the end condition of the rule (see get_first_index_in_range)
+    instead of generating every occurrence before it
+    :return: The (occurrence number, start date, end date) of the last occurrence
+    """
+    occurrence_type = get_rule_value(recurrence_details, 'occurrence_type')
+    get_occurrence_dates = get_occurrence_dates_function(start_date, end_date, recurrence_details)
+
+    if occurrence_type == constants.OccurrenceType.AFTER.value:
+        index = get_rule_value(recurrence_details, 'num_recurrences') - 1
+    elif occurrence_type == constants.OccurrenceType.ON.value:
+        # The first occurrence starting after the end date of the rule, found from the start dates only; the first
+        # occurrence of a relative rule can start before the start date of the event
+        on_end_date = get_rule_value(recurrence_details, 'on_end_date')
+        index = get_first_index_in_range(start_date, start_date, recurrence_details,
+                                         on_end_date + timedelta(microseconds=1))
+        while get_occurrence_dates(index)[0] <= on_end_date:
+            index += 1
+        index -= 1
+    else:
+        raise ValueError('The last occurrence of a recurrence which never ends cannot be computed')
+
+    if index < 0:
+        return None
+
+    return (index + 1,) + get_occurrence_dates(index)
+
+
+def get_last_index_function(recurrence_details):
+    """
+    Returns the function checking whether an occurrence, given its index and start date, is past the end of a
+    recurrence rule
+    """
+    occurrence_type = get_rule_value(recurrence_details, 'occurrence_type')
+
+    if occurrence_type == constants.OccurrenceType.NEVER.value:
+        return lambda index, occurrence_start_date: False
+
+    if occurrence_type == constants.OccurrenceType.AFTER.value:
+        num_recurrences = get_rule_value(recurrence_details, 'num_recurrences')
+        return lambda index, occurrence_start_date: index >= num_recurrences
+
+    if occurrence_type == constants.OccurrenceType.ON.value:
+        on_end_date = get_rule_value(recurrence_details, 'on_end_date')
+        return lambda index, occurrence_start_date: occurrence_start_date > on_end_date
+
+    raise ValueError('Invalid value, must be one of {}'.format(constants.OccurrenceType.values()))
+
+
+def get_interval_period(recurrence_details):
+    """
+    Returns the number of days or months (the other being 0) between two consecutive occurrences of a recurrence rule
+
+    Raises a ValueError if the rule does not move forward from one occurrence to the next
+    """
+    day_of_week, week_of_month, separation_count = get_relative_interval_details(recurrence_details)
+
+    if day_of_week and week_of_month:
+        if not separation_count or separation_count < 1:
+            raise ValueError('Invalid separation count {}, must be at least 1'.format(separation_count))
+        return 0, separation_count
+
+    day_separation, week_separation, month_separation = \
+        define_interval_increments(get_rule_value(recurrence_details, 'recurrence'))
+    days = day_separation + 7 * week_separation
+
+    if days < 1 and month_separation < 1:
+        raise ValueError('Invalid interval of {} days and {} months, must be positive'.format(days, month_separation))
+
+    return days, month_separation
+
+
+def get_occurrence_dates_function(start_date, end_date, recurrence_details):
+    """
+    Returns the function computing the start and end dates of the occurrence of a given index (from 0)
+    """
+    day_of_week, week_of_month, separation_count = get_relative_interval_details(recurrence_details)
+
+    if day_of_week and week_of_month:
+        def get_relative_occurrence_dates(index):
+            return set_relative_occurrence_date(start_date, end_date, day_of_week, week_of_month,
+                                                index * separation_count)
+
+        return get_relative_occurrence_dates
+
+    day_separation, week_separation, month_separation = \
+        define_interval_increments(get_rule_value(recurrence_details, 'recurrence'))
+
+    def get_absolute_occurrence_dates(index):
+        return set_absolute_occurrence_date(start_date, end_date, index * day_separation, index * week_separation,
+                                            index * month_separation)
+
+    return get_absolute_occurrence_dates
+
+
+# ------------------------------------
+# Absolute Event Interval Functions
+# ------------------------------------
+def base_daily_interval():
+    return 1, 0, 0
+
+
+def base_weekly_interval():
+    return 0, 1, 0
+
+
+def base_bi_weekly_interval():
+    return 0, 2, 0
+
+
+def base_monthly_interval():
+    return 0, 0, 1
+
+
+def define_interval_increments(recurrence):
+    switcher = {
+        constants.RecurrenceType.DAILY.value: base_daily_interval(),
+        constants.RecurrenceType.WEEKLY.value: base_weekly_interval(),
+        constants.RecurrenceType.BI_WEEKLY.value: base_bi_weekly_interval(),
+        constants.RecurrenceType.MONTHLY.value: base_monthly_interval()
+    }
+
+    # Get the function from switcher dictionary
+    return switcher.get(recurrence, lambda: "Invalid Interval Value")
+
+
+# ------------------------------------
+# Relative Event Interval Functions
+# ------------------------------------
+def get_relative_interval_details(recurrence_details):
+    return get_rule_value(recurrence_details, 'day_of_week'), \
+           get_rule_value(recurrence_details, 'week_of_month'), \
+           get_rule_value(recurrence_details, 'separation_count')
+
+
+def set_absolute_occurrence_date(start_date, end_date, day_separation, week_separation, month_separation):
+    """
+    Sets the absolute date intervals for DAILY, WEEKLY, BI_WEEKLY, and MONTHLY frequency
+    For example: Every 3rd of the month
+    :param start_date: The current start date
+    :param end_date: The current end date
+    :param day_separation: The number of days between events
+    :param week_separation: The number of weeks between events
+    :param month_separation:  The number of months between events
+    :return:
+    """
+    new_start_date = start_date + relativedelta(days=+day_separation,
+                                                weeks=+week_separation,
+                                                months=+month_separation)
+
+    new_end_date = end_date + relativedelta(days=+day_separation,
+                                            weeks=+week_separation,
+                                            months=+month_separation)
+
+    return new_start_date, new_end_date
+
+
+def set_relative_occurrence_date(start_date, end_date, day_of_week, week_of_month, separation_count):
+    """
+    Sets the relative date interval between events
+
+    :param start_date:
+    :param end_date:
+    :param month_separation:
+    :param day_of_week:
+    :param week_of_month:
+    :param separation_count:
+    :return:
+    # Support for every specific interval
+    # For example: Every month on the 3rd day of the 2nd week
+    """
+    start_end_difference = relativedelta(end_date, start_date)
+    new_start_date = set_next_relative_date(start_date, day_of_week, week_of_month, separation_count)
+    new_end_date = new_start_date + start_end_difference
+
+    return new_start_date, new_end_date
+
+
+def set_next_relative_date(start_date, day_of_week, week_of_month, separation_count):
+    arg = MO(1)
+
+    if day_of_week == 1:
+        arg = MO(week_of_month)
+    if day_of_week == 2:
+        arg = TU(week_of_month)
+    if day_of_week == 3:
+        arg = WE(week_of_month)
+    if day_of_week == 4:
+        arg = TH(week_of_month)
+    if day_of_week == 5:
+        arg = FR(week_of_month)
+    if day_of_week == 6:
+        arg = SA(week_of_month)
+    if day_of_week == 7:
+        arg = SU(week_of_month)
+
+    if week_of_month == -1:
+        return start_date + relativedelta(day=31,
+                                          months=+separation_count,
+                                          weekday=arg)
+
+    return start_date + relativedelta(day=1,
+                                      months=+separation_count,
+                                      weekday=arg)
@@ -1,5 +1,6 @@
-from core.resource import ma
-from marshmallow import fields, ValidationError
+from core.resource import ma, PaginationSchema
+from core.serializer import FastSerializer
+from marshmallow import fields, validate, ValidationError
 from services.events import constants
 
 
@@ -27,7 +28,7 @@ class RecurrenceDetails(ma.Schema):
     on_end_date = fields.DateTime(load_only=True, required=False, format=constants.EVENT_DATE_FORMAT)
     day_of_week = fields.Int(required=False, validate=lambda val: 1 <= val <= 7)
     week_of_month = fields.Int(required=False, validate=lambda val: 1 <= val <= 4)
-    separation_count = fields.Int(required=False, missing=1)
+    separation_count = fields.Int(required=False, missing=1, validate=validate.Range(min=1))
     # days_of_week = fields.List(fields.Int(), validate=lambda val: 1 <= val <= 7, required=False)
 
     class Meta:
@@ -41,7 +42,7 @@ class EventSchema(ma.Schema):
     name = fields.Str(required=True)
     description = fields.Str(missing="")
     contact_email = fields.Str(required=True)
-    categories = fields.List(fields.Str, missing=[])
+    categories = fields.List(fields.Str(validate=validate.Length(min=1)), missing=[])
     location = fields.Str(required=True)
     start_date = fields.DateTime(required=True, format=constants.EVENT_DATE_FORMAT)
     end_date = fields.DateTime(required=True, format=constants.EVENT_DATE_FORMAT)
@@ -78,7 +79,7 @@ class EventOccurrenceDetailsSchema(EventDetailsSchema):
 class EventUpdateSchema(ma.Schema):
     name = fields.Str(required=False)
     description = fields.Str(required=False)
-    categories = fields.List(fields.Str, missing=[])
+    categories = fields.List(fields.Str(validate=validate.Length(min=1)), missing=[])
     contact_email = fields.Str(required=False)
     location = fields.Str(required=False)
     # start_date = fields.DateTime(required=False, format=constants.EVENT_DATE_FORMAT)
@@ -116,10 +117,31 @@ class EventOccurrenceUpdateSchema(ma.Schema):
         strict = True
 
 
-class EventFiltersSchema(ma.Schema):
+class EventFiltersSchema(PaginationSchema):
     start_date = fields.DateTime(required=False, missing=None, format=constants.EVENT_DATE_FORMAT)
     end_date = fields.DateTime(required=False, missing=None, format=constants.EVENT_DATE_FORMAT)
     categories = fields.Str(required=False, missing=None)
+    stream = fields.Bool(required=False, missing=False)
+
+    class Meta:
+        strict = True
+
+
+class EventDeleteFiltersSchema(ma.Schema):
+    start_date = fields.DateTime(required=False, missing=None, format=constants.EVENT_DATE_FORMAT)
+    end_date = fields.DateTime(required=False, missing=None, format=constants.EVENT_DATE_FORMAT)
+    categories = fields.Str(required=False, missing=None)
+    cursor = fields.Str(required=False, missing=None)
+
+    class Meta:
+        strict = True
+
+
+class EventDeleteResultSchema(ma.Schema):
+    deleted = fields.Integer(dump_only=True)
+    failed = fields.List(fields.Str(), dump_only=True)
+    cursor = fields.Str(dump_only=True)
+    _links = fields.Dict(dump_only=True)
 
     class Meta:
         strict = True
@@ -134,9 +156,14 @@ class EventDetailsFilterSchema(ma.Schema):
 
 event_list_schema = EventListSchema()
 event_details_schema = EventDetailsSchema()
+event_delete_filters_schema = EventDeleteFiltersSchema()
+event_delete_result_schema = EventDeleteResultSchema()
 event_details_filter_schema = EventDetailsFilterSchema()
 event_filters_schema = EventFiltersSchema()
 event_occurrence_details_schema = EventOccurrenceDetailsSchema()
 event_occurrence_update_schema = EventOccurrenceUpdateSchema()
 event_update_schema = EventUpdateSchema()
 
+event_list_serializer = FastSerializer(event_list_schema)
+event_occurrence_details_serializer = FastSerializer(event_occurrence_details_schema)
+
@@ -1,26 +1,56 @@
-from core import db
+from itertools import islice
+
 from flask import Blueprint, jsonify
+from marshmallow import ValidationError
 from webargs.flaskparser import use_kwargs
 
-from core.db.events import remove_event_from_db, get_event_from_db
+from core import errors
+from core.db import get_projection
+from core.db.events import get_event_from_db
 from core.db.events.model import EventModel
 from core.db.organizations import get_verified_organization_from_db
-from services.events import build_list_events_scan_condition, \
-    get_event_occurrence, get_recurring_events_list, set_dates_filter, set_category_filter
-from services.events.create_utils import create_event
-from services.events.resource import event_details_schema, event_details_filter_schema, event_filters_schema, \
-    event_list_schema, event_occurrence_details_schema, event_update_schema
+from core.resource import get_etag, get_links, get_not_modified_response, get_paged_response, \
+    get_request_records, get_streamed_list_response, set_etag
+from services.events import constants, set_category_filter, set_dates_filter
+from services.events.create_utils import build_event, create_event, create_events
+from services.events.delete_utils import delete_events
+from services.events.index import get_events_in_date_range, get_events_page_in_date_range, remove_event_from_db, \
+    set_page_dates_filter, update_event_in_db
+from services.events.listing_cache import invalidate_listings
+from services.events.occurrences import get_event_occurrence, get_event_occurrences, get_events_occurrences, \
+    is_open_ended_event
+from services.events.resource import event_delete_filters_schema, event_delete_result_schema, event_details_schema, \
+    event_details_filter_schema, event_filters_schema, event_list_schema, event_list_serializer, \
+    event_occurrence_details_serializer, event_update_schema
 from services.events.update_utils import build_update_actions
 
 blueprint = Blueprint('events', __name__)
 
+# Attributes read for the event listings: the dumped fields, the occurrences or recurrence rule the events are
+# listed from and the update date of the ETag
+event_list_attributes = get_projection(EventModel, event_list_schema, 'occurrences', 'is_rule_based', 'start_date',
+                                       'first_end_date', 'recurrence_details', 'updated_at')
+
 
 @blueprint.route('/events', defaults={'org_id': None}, methods=["GET"])
 @blueprint.route('/organizations/<org_id>/events', methods=["GET"])
 @use_kwargs(event_filters_schema, locations=('query',))
 def list_events(org_id, **kwargs):
-    scan_condition = build_list_events_scan_condition(org_id)
-    events_list = EventModel.scan(scan_condition)
+    filter_start_date, filter_end_date = set_dates_filter(kwargs['start_date'], kwargs['end_date'])
+    filter_categories = set_category_filter(kwargs['categories'])
+
+    if kwargs['limit'] is not None:
+        # The pages following the first one are listed for its date range
+        filter_start_date, filter_end_date = set_page_dates_filter(kwargs['start_date'], kwargs['end_date'],
+                                                                   kwargs['cursor'])
+        events_list, next_cursor = get_events_page_in_date_range(filter_start_date, filter_end_date, org_id,
+                                                                 kwargs['limit'], kwargs['cursor'], filter_categories,
+                                                                 event_list_attributes)
+        kwargs.update(start_date=filter_start_date, end_date=filter_end_date)
+        return get_events_response(events_list, next_cursor=next_cursor, **kwargs)
+
+    events_list = get_events_in_date_range(filter_start_date, filter_end_date, org_id, filter_categories,
+                                           event_list_attributes)
     return get_events_response(events_list, **kwargs)
 
 
@@ -40,12 +70,65 @@ def create_organization_event(org_id, **kwargs):
     return response
 
 
+@blueprint.route('/organizations/<org_id>/events/bulk', methods=["POST"])
+def create_organization_events(org_id):
+    records = get_request_records(constants.MAX_BULK_EVENTS)
+    organization = get_verified_organization_from_db(org_id)
+
+    results = []
+    created = []
+    for index, record in enumerate(records):
+        try:
+            event_args = {k: v for k, v in event_details_schema.load(record).items() if v is not None}
+            event = build_event(owner=organization.id, owner_name=organization.name, **event_args)
+        except ValidationError as e:
+            results.append(get_bulk_result(index, 422, messages=e.messages))
+            continue
+        except errors.ResourceValidationError as e:
+            results.append(get_bulk_result(index, e.status_code, **e.to_dict()))
+            continue
+
+        result = get_bulk_result(index, 201)
+        results.append(result)
+        created.append((result, event))
+
+    # The events are saved together once they are all validated, the results of the unsaved ones are updated
+    unsaved_ids = {event.id for event in create_events([event for _, event in created])}
+    for result, event in created:
+        if event.id in unsaved_ids:
+            result.update(status=500, messages={'event': ['Unable to save the event']})
+        else:
+            result['event'] = event_details_schema.dump(event)
+
+    response = jsonify(results)
+    response.status_code = 207
+
+    return response
+
+
+@blueprint.route('/organizations/<org_id>/events', methods=['DELETE'])
+@use_kwargs(event_delete_filters_schema, locations=('query',))
+def cancel_organization_events(org_id, **kwargs):
+    deleted_count, undeleted_ids, next_cursor = delete_events(org_id, kwargs['start_date'], kwargs['end_date'],
+                                                              set_category_filter(kwargs['categories']),
+                                                              kwargs['cursor'])
+
+    return jsonify(event_delete_result_schema.dump({'deleted': deleted_count, 'failed': undeleted_ids,
+                                                    'cursor': next_cursor, '_links': get_links(next_cursor)}))
+
+
 @blueprint.route('/organizations/<org_id>/events/<event_id>', methods=["GET"])
 @use_kwargs(event_details_filter_schema, locations=('query',))
 def get_organization_event(org_id, event_id, **kwargs):
     event = get_event_from_db(event_id, org_id)
+
+    etag = get_etag([event], kwargs.get('occurrence_num'))
+    not_modified = get_not_modified_response(etag)
+    if not_modified:
+        return not_modified
+
     occurrence = get_event_occurrence(event, kwargs.get('occurrence_num'))
-    return jsonify(event_occurrence_details_schema.dump(occurrence))
+    return set_etag(jsonify(event_occurrence_details_serializer.dump(occurrence)), etag)
 
 
 @blueprint.route('/organizations/<org_id>/events/<event_id>/occurrences', methods=["GET"])
@@ -62,7 +145,8 @@ def update_organization_event(org_id, event_id, **kwargs):
 
     event = get_event_from_db(event_id, org_id)
     actions = build_update_actions(event, kwargs)
-    db.update_item(event, actions)
+    update_event_in_db(event, actions)
+    invalidate_listings(event.owner)
 
     return jsonify(event_details_schema.dump(event))
 
@@ -70,6 +154,7 @@ def update_organization_event(org_id, event_id, **kwargs):
 @blueprint.route('/organizations/<org_id>/events/<event_id>', methods=['DELETE'])
 def cancel_organization_event(org_id, event_id):
     remove_event_from_db(event_id, org_id)
+    invalidate_listings(org_id)
 
     return '', 204
 
@@ -89,22 +174,53 @@ def cancel_organization_event(org_id, event_id):
 # ----------------------------------------------------
 # Helper Functions
 # ----------------------------------------------------
-def get_events_response(events_list, **kwargs):
+def get_events_response(events_list, next_cursor=None, **kwargs):
     # Set the filters
     filter_start_date, filter_end_date = set_dates_filter(kwargs['start_date'], kwargs['end_date'])
     filter_categories = set_category_filter(kwargs['categories'])
 
-    response = []
-    for event in events_list:
-        occurrences = get_recurring_events_list(event, filter_start_date, filter_end_date, filter_categories)
-        for occurrence in occurrences:
-            response.append(event_list_schema.dump(occurrence))
+    # Stream the events as they are read instead of holding the list of the events and of their dumps
+    if kwargs.get('stream') and kwargs.get('limit') is None:
+        occurrences = get_events_occurrences(events_list, filter_start_date, filter_end_date, filter_categories)
+        return get_streamed_list_response(event_list_serializer.dump(occurrence) for occurrence in occurrences)
+
+    # Unchanged listings are answered before building and serializing the occurrences
+    events_list = list(events_list)
+    etag = get_events_etag(events_list, filter_start_date, filter_end_date, filter_categories,
+                           kwargs.get('limit'), next_cursor)
+    not_modified = get_not_modified_response(etag)
+    if not_modified:
+        return not_modified
+
+    response = get_events_list(events_list, filter_start_date, filter_end_date, filter_categories)
+
+    if kwargs.get('limit') is not None:
+        return set_etag(get_paged_response(response, kwargs['limit'], next_cursor), etag)
+
+    return set_etag(jsonify(response), etag)
 
-    return jsonify(response)
+
+def get_events_etag(events_list, start_date, end_date, category_filters, limit=None, next_cursor=None):
+    return get_etag(events_list, start_date, end_date, sorted(set(category_filters)), limit, next_cursor)
+
+
+def get_events_list(events_list, start_date, end_date, category_filters):
+    occurrences = get_events_occurrences(events_list, start_date, end_date, category_filters)
+    return event_list_serializer.dump(occurrences, many=True)
+
+
+def get_bulk_result(index, status, **kwargs):
+    return dict(index=index, status=status, **kwargs)
 
 
 def get_all_occ_from_event_response(event):
-    response = [event_list_schema.dump(occurrence) for occurrence in event.occurrences]
+    occurrences = get_event_occurrences(event)
+
+    # The occurrences of the events which never end are listed up to the maximum number of recurrences
+    if is_open_ended_event(event):
+        occurrences = islice(occurrences, constants.MAX_RECURRENCE)
+
+    response = event_list_serializer.dump(list(occurrences), many=True)
 
     # for occurrence in event.occurrences:
     #     response.append(event_list_schema.dump(occurrence))
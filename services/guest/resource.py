@@ -1,4 +1,5 @@
 from core.resource import ma
+from core.serializer import FastSerializer
 from marshmallow import fields
 
 
@@ -19,3 +20,5 @@ class EventDetailsFilterSchema(ma.Schema):
 
 organization_list_schema = OrganizationListSchema()
 event_details_filter_schema = EventDetailsFilterSchema()
+
+organization_list_serializer = FastSerializer(organization_list_schema)
@@ -5,25 +5,41 @@ This class holds end points which are used for guest access
 from flask import Blueprint, jsonify
 from webargs.flaskparser import use_kwargs
 
+from core.db import get_projection, parallel_scan, scan_page
 from core.db.events import get_event_from_db
-from core.db.events.model import EventModel
 from core.db.organizations.model import OrganizationModel
-from services.events import get_event_occurrence
-from services.events.resource import event_filters_schema, event_occurrence_details_schema
-from services.events.routes import get_events_response
-from services.guest import build_list_events_scan_condition
-from services.guest.resource import event_details_filter_schema, organization_list_schema
+from core.resource import get_etag, get_not_modified_response, get_paged_response, pagination_schema, set_etag
+from services.events import set_category_filter, set_dates_filter
+from services.events.index import get_events_in_date_range, get_events_page_in_date_range, set_page_dates_filter
+from services.events.listing_cache import get_cached_listing
+from services.events.occurrences import get_event_occurrence
+from services.events.resource import event_filters_schema, event_occurrence_details_serializer
+from services.events.routes import event_list_attributes, get_events_etag, get_events_list, get_events_response
+from services.guest.resource import event_details_filter_schema, organization_list_schema, \
+    organization_list_serializer
 
 blueprint = Blueprint('guest', __name__)
 
+# Attributes read for the organization listings
+organization_list_attributes = get_projection(OrganizationModel, organization_list_schema)
+
 
 # -------------------------
 # Organization End Points
 # -------------------------
 @blueprint.route('/guests/organizations', methods=["GET"])
-def list_verified_organizations():
-    organizations = OrganizationModel.scan(OrganizationModel.is_verified == True)
-    response = [organization_list_schema.dump(org).data for org in organizations]
+@use_kwargs(pagination_schema, locations=('query',))
+def list_verified_organizations(**kwargs):
+    scan_condition = OrganizationModel.is_verified == True
+
+    if kwargs['limit'] is not None:
+        organizations, next_cursor = scan_page(OrganizationModel, scan_condition, kwargs['limit'], kwargs['cursor'],
+                                               organization_list_attributes)
+        response = organization_list_serializer.dump(organizations, many=True)
+        return get_paged_response(response, kwargs['limit'], next_cursor)
+
+    organizations = parallel_scan(OrganizationModel, scan_condition, attributes_to_get=organization_list_attributes)
+    response = organization_list_serializer.dump(organizations, many=True)
 
     return jsonify(response)
 
@@ -35,15 +51,49 @@ def list_verified_organizations():
 @blueprint.route('/guests/organizations/<org_id>/events', methods=["GET"])
 @use_kwargs(event_filters_schema, locations=('query',))
 def list_events(org_id, **kwargs):
-    scan_condition = build_list_events_scan_condition(org_id)
-    events_list = EventModel.scan(scan_condition)
-    return get_events_response(events_list, **kwargs)
+    filter_start_date, filter_end_date = set_dates_filter(kwargs['start_date'], kwargs['end_date'])
+    filter_categories = set_category_filter(kwargs['categories'])
+
+    if kwargs['limit'] is not None:
+        # The pages following the first one are listed for its date range
+        filter_start_date, filter_end_date = set_page_dates_filter(kwargs['start_date'], kwargs['end_date'],
+                                                                   kwargs['cursor'])
+        events_list, next_cursor = get_events_page_in_date_range(filter_start_date, filter_end_date, org_id,
+                                                                 kwargs['limit'], kwargs['cursor'], filter_categories,
+                                                                 event_list_attributes)
+        kwargs.update(start_date=filter_start_date, end_date=filter_end_date)
+        return get_events_response(events_list, next_cursor=next_cursor, **kwargs)
+
+    if kwargs['stream']:
+        events_list = get_events_in_date_range(filter_start_date, filter_end_date, org_id, filter_categories,
+                                               event_list_attributes)
+        return get_events_response(events_list, **kwargs)
+
+    # The guest listings are the same for every user, the whole listings are cached until an event changes
+    def load_listing():
+        events_list = list(get_events_in_date_range(filter_start_date, filter_end_date, org_id, filter_categories,
+                                                    event_list_attributes))
+        return (get_events_etag(events_list, filter_start_date, filter_end_date, filter_categories),
+                get_events_list(events_list, filter_start_date, filter_end_date, filter_categories))
+
+    etag, response = get_cached_listing(org_id, filter_start_date, filter_end_date, filter_categories, load_listing)
+    not_modified = get_not_modified_response(etag)
+    if not_modified:
+        return not_modified
+
+    return set_etag(jsonify(response), etag)
 
 
 @blueprint.route('/guests/organizations/<org_id>/events/<event_id>', methods=["GET"])
 @use_kwargs(event_details_filter_schema, locations=('query',))
 def get_organization_event(org_id, event_id, **kwargs):
     event = get_event_from_db(event_id, org_id)
+
+    etag = get_etag([event], kwargs.get('occurrence_num'))
+    not_modified = get_not_modified_response(etag)
+    if not_modified:
+        return not_modified
+
     occurrence = get_event_occurrence(event, kwargs.get('occurrence_num'))
-    return jsonify(event_occurrence_details_schema.dump(occurrence))
+    return set_etag(jsonify(event_occurrence_details_serializer.dump(occurrence)), etag)
 
@@ -1,4 +1,5 @@
-from core.resource import ma
+from core.resource import ma, PaginationSchema
+from core.serializer import FastSerializer
 from marshmallow import fields
 
 
@@ -22,7 +23,7 @@ class AdministratorDetails(ma.Schema):
     last_name = fields.Str(dump_only=True)
 
 
-class OrganizationListFiltersSchema(ma.Schema):
+class OrganizationListFiltersSchema(PaginationSchema):
     class Meta:
         strict = True
 
@@ -72,3 +73,5 @@ organization_list_filters_schema = OrganizationListFiltersSchema()
 organization_details_schema = OrganizationDetailsSchema()
 organization_update_schema = OrganizationUpdateSchema()
 organization_verification_schema = OrganizationVerificationSchema()
+
+organization_serializer = FastSerializer(organization_schema)
@@ -1,22 +1,26 @@
-from core import configuration, db, errors
-from core.aws.ses import SES
+from core import configuration, db
+from core.aws.outbox import send_email_later
 from flask import Blueprint, jsonify
 from webargs.flaskparser import use_kwargs
 
 from core.db.organizations import check_for_duplicate_name, get_organization_from_db
 from core.db.organizations.model import OrganizationModel
 from core.db.users import get_user_by_email, get_user_by_id
+from core.resource import get_paged_response
 
 from services.organizations import build_scan_condition, build_update_actions, build_user_organization_actions, \
     build_verify_organization_actions
 from services.organizations.resource import organization_details_schema, organization_list_filters_schema,\
-    organization_schema, organization_update_schema, organization_verification_schema
+    organization_schema, organization_serializer, organization_update_schema, organization_verification_schema
 
 import logging
 logger = logging.getLogger(__name__)
 
 blueprint = Blueprint('organizations', __name__)
 
+# Attributes read for the organization listings
+organization_list_attributes = db.get_projection(OrganizationModel, organization_schema)
+
 
 # ----------------------------------
 # Organization Registration Routes
@@ -25,29 +29,26 @@ blueprint = Blueprint('organizations', __name__)
 @use_kwargs(organization_details_schema, locations=('json',))
 def register_organization(**kwargs):
     name = kwargs['name']
-    check_for_duplicate_name(name)
 
-    # Verify the that administrator user exists in the system
-    get_user_by_id(kwargs['administrator_id'])
+    # Check the name and verify that the administrator user exists in the system at the same time
+    duplicate_name_check = db.submit(check_for_duplicate_name, name)
+    administrator = db.submit(get_user_by_id, kwargs['administrator_id'])
+    duplicate_name_check.result()
+    administrator.result()
 
     # Create the organization
     organization = OrganizationModel(**kwargs)
     db.save_with_unique_id(organization)
 
-    # Send an email to the administrator for verification
+    # Queue an email to the administrator for verification
     recipients = [configuration.get_setting('verification_email_recipient')]
-    try:
-        ses = SES()
-        verification_url = f"{configuration.get_setting('UI_DOMAIN_NAME')}/validation/{organization.id}"
-        ses.send_email(recipients=recipients,
-                       subject='New Organization Request',
-                       body='New Caring Calendar organization request for {}.  Please go to {} to verify the request.'.format(
-                           name,
-                           verification_url
-                       ))
-    except errors.SESError:
-        # TODO: In addition to logging message include in response message indicating that the email failed to send
-        logger.warning('Organization {} created; error sending email to {}.'.format(name, recipients))
+    verification_url = f"{configuration.get_setting('UI_DOMAIN_NAME')}/validation/{organization.id}"
+    send_email_later(recipients=recipients,
+                     subject='New Organization Request',
+                     body='New Caring Calendar organization request for {}.  Please go to {} to verify the request.'.format(
+                         name,
+                         verification_url
+                     ))
 
     response = jsonify(organization_details_schema.dump(organization))
     response.status_code = 201
@@ -62,30 +63,29 @@ def verify_organization(org_id, **kwargs):
     is_verified = kwargs['is_verified']
 
     if is_verified and not organization.is_verified:
+        # The admin user is read while the organization is updated
+        org_user_result = db.submit(get_user_by_id, organization.administrator_id)
+
         organization_actions = build_verify_organization_actions(is_verified)
         db.update_item(organization, organization_actions)
 
         # we've verified the organization and ensured that the admin user
         # is a valid user so add the organization to
-        org_user = get_user_by_id(organization.administrator_id)
+        org_user = org_user_result.result()
         user_actions = build_user_organization_actions(organization)
         db.update_item(org_user, user_actions)
 
         # TODO: Send the user an email indicating the organization has been verified
         recipient = org_user.email
 
-        try:
-            ses = SES()
-            signin_url = f"{configuration.get_setting('UI_DOMAIN_NAME')}/login"
-            ses.send_email(recipients=[recipient],
-                           subject='Organization Request Approved',
-                           body='The organization {} has been approved for use in the Caring Calendar.  '
-                                'Please go to {} to start entering events.'.format(
-                               organization.name,
-                               signin_url
-                           ))
-        except errors.SESError:
-            logger.warning(f"Error sending email to {recipient}")
+        signin_url = f"{configuration.get_setting('UI_DOMAIN_NAME')}/login"
+        send_email_later(recipients=[recipient],
+                         subject='Organization Request Approved',
+                         body='The organization {} has been approved for use in the Caring Calendar.  '
+                              'Please go to {} to start entering events.'.format(
+                             organization.name,
+                             signin_url
+                         ))
 
     return jsonify(organization_details_schema.dump(organization))
 
@@ -97,9 +97,17 @@ def verify_organization(org_id, **kwargs):
 @use_kwargs(organization_list_filters_schema, locations=('query',))
 def list_organizations(**kwargs):
     scan_condition = build_scan_condition(**kwargs)
-    organizations = OrganizationModel.scan(scan_condition)
 
-    response = [organization_schema.dump(org) for org in organizations]
+    if kwargs['limit'] is not None:
+        organizations, next_cursor = db.scan_page(OrganizationModel, scan_condition, kwargs['limit'],
+                                                  kwargs['cursor'], organization_list_attributes)
+        response = organization_serializer.dump(organizations, many=True)
+        return get_paged_response(response, kwargs['limit'], next_cursor)
+
+    organizations = db.parallel_scan(OrganizationModel, scan_condition,
+                                     attributes_to_get=organization_list_attributes)
+
+    response = organization_serializer.dump(organizations, many=True)
     return jsonify(response)
 
 
@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The models read the region when they are imported
+os.environ.setdefault('AWS_REGION', 'ca-central-1')
@@ -0,0 +1,50 @@
+"""
+The rule based events must be indexed in the week buckets before the index horizon, and in the horizon bucket when
+they have occurrences after it
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.db.events.model import EventModel
+from services.events import constants
+from services.events.create_utils import set_occurrences
+from services.events.index import get_bucket, get_buckets, get_event_index_keys
+
+START_DATE = datetime(2019, 10, 7)
+HORIZON = START_DATE + timedelta(weeks=constants.INDEX_HORIZON_WEEKS)
+
+
+def make_rule_based_event(**recurrence_details):
+    event_args = dict(start_date=START_DATE, end_date=START_DATE + timedelta(days=1), categories=['arts'],
+                      is_recurring=True, recurrence_details=dict(recurrence='DAILY', **recurrence_details))
+    set_occurrences(event_args)
+
+    return EventModel('event', 'organization', **event_args)
+
+
+@pytest.mark.parametrize('recurrence_details, is_past_horizon', [
+    ({'occurrence_type': 'NEVER'}, True),
+    ({'occurrence_type': 'ON', 'on_end_date': datetime(2200, 1, 1)}, True),
+    ({'occurrence_type': 'ON', 'on_end_date': HORIZON - timedelta(days=2)}, False),
+])
+def test_rule_based_event_is_indexed_up_to_horizon(recurrence_details, is_past_horizon):
+    event = make_rule_based_event(**recurrence_details)
+
+    buckets, category_buckets = get_event_index_keys(event, HORIZON)
+
+    week_buckets = set(get_buckets(START_DATE, HORIZON - timedelta(days=1)))
+    assert buckets - {constants.HORIZON_BUCKET} == week_buckets
+    assert (constants.HORIZON_BUCKET in buckets) == is_past_horizon
+    assert category_buckets == {('arts', bucket) for bucket in buckets}
+
+
+def test_extended_event_keeps_its_buckets():
+    event = make_rule_based_event(occurrence_type='NEVER')
+    later_horizon = HORIZON + timedelta(weeks=3)
+
+    buckets, _ = get_event_index_keys(event, HORIZON)
+    later_buckets, _ = get_event_index_keys(event, later_horizon)
+
+    assert buckets <= later_buckets
+    assert max(later_buckets - {constants.HORIZON_BUCKET}) < get_bucket(later_horizon)
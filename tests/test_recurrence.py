@@ -0,0 +1,133 @@
+"""
+The occurrences of a recurrence rule in a date range must be the occurrences of the whole rule filtered on the range
+"""
+from datetime import datetime, timedelta
+from itertools import islice, takewhile
+
+import pytest
+
+from hypothesis import given, settings, strategies as st
+from marshmallow import ValidationError
+
+from services.events import constants
+from services.events import recurrence
+from services.events.recurrence import get_first_index_in_range, get_interval_period, get_last_occurrence, \
+    get_occurrences, iter_occurrence_dates, iter_occurrence_dates_in_range
+from services.events.resource import RecurrenceDetails
+
+start_dates = st.datetimes(min_value=datetime(2019, 1, 1), max_value=datetime(2030, 12, 31)).map(
+    lambda date: date.replace(second=0, microsecond=0))
+durations = st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=3))
+
+
+@st.composite
+def end_conditions(draw, start_date):
+    occurrence_type = draw(st.sampled_from([item.value for item in constants.OccurrenceType]))
+
+    if occurrence_type == constants.OccurrenceType.AFTER.value:
+        return {'occurrence_type': occurrence_type,
+                'num_recurrences': draw(st.integers(constants.MIN_RECURRENCE, constants.MAX_RECURRENCE))}
+    if occurrence_type == constants.OccurrenceType.ON.value:
+        return {'occurrence_type': occurrence_type,
+                'on_end_date': start_date + draw(st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=900)))}
+
+    return {'occurrence_type': occurrence_type}
+
+
+@st.composite
+def recurrence_rules(draw, start_date):
+    rule = {'recurrence': draw(st.sampled_from([item.value for item in constants.RecurrenceType]))}
+
+    if draw(st.booleans()):
+        rule.update(day_of_week=draw(st.integers(1, 7)), week_of_month=draw(st.sampled_from([1, 2, 3, 4, -1])),
+                    separation_count=draw(st.integers(1, 3)))
+
+    rule.update(draw(end_conditions(start_date)))
+    return rule
+
+
+@st.composite
+def rules_and_windows(draw):
+    start_date = draw(start_dates)
+    end_date = start_date + draw(durations)
+    rule = draw(recurrence_rules(start_date))
+    range_start_date = start_date + draw(st.timedeltas(min_value=timedelta(days=-60), max_value=timedelta(days=1500)))
+    range_end_date = range_start_date + draw(st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=120)))
+
+    return start_date, end_date, rule, range_start_date, range_end_date
+
+
+def get_expected_occurrences(start_date, end_date, rule, range_start_date, range_end_date):
+    occurrences = takewhile(lambda occurrence: occurrence[1] <= range_end_date,
+                            iter_occurrence_dates(start_date, end_date, rule))
+    return [occurrence for occurrence in occurrences if occurrence[2] >= range_start_date]
+
+
+@settings(deadline=None)
+@given(rules_and_windows())
+def test_occurrences_in_range_match_filtered_occurrences(rule_and_window):
+    assert list(iter_occurrence_dates_in_range(*rule_and_window)) == get_expected_occurrences(*rule_and_window)
+
+
+@settings(deadline=None)
+@given(rules_and_windows())
+def test_first_index_in_range_is_first_occurrence_ending_in_range(rule_and_window):
+    start_date, end_date, rule, range_start_date, _ = rule_and_window
+    rule = dict(rule, occurrence_type=constants.OccurrenceType.NEVER.value)
+
+    index = get_first_index_in_range(start_date, end_date, rule, range_start_date)
+    occurrences = list(islice(iter_occurrence_dates(start_date, end_date, rule), index + 1))
+
+    # No occurrence in the range is skipped, and the ones skipped are all before it
+    assert all(occurrence_end_date < range_start_date for _, _, occurrence_end_date in occurrences[:index])
+    assert index == 0 or occurrences[index][2] >= range_start_date
+
+
+@settings(deadline=None)
+@given(rules_and_windows())
+def test_last_occurrence_is_last_generated_occurrence(rule_and_window):
+    start_date, end_date, rule, _, _ = rule_and_window
+    if rule['occurrence_type'] == constants.OccurrenceType.NEVER.value:
+        on_end_date = start_date - timedelta(days=3)
+        rule = dict(rule, occurrence_type=constants.OccurrenceType.ON.value, on_end_date=on_end_date)
+
+    occurrences = list(iter_occurrence_dates(start_date, end_date, rule))
+
+    assert get_last_occurrence(start_date, end_date, rule) == (occurrences[-1] if occurrences else None)
+
+
+@pytest.mark.parametrize('days, is_memoized', [(recurrence.OCCURRENCES_CACHE_MAX_OCCURRENCES - 1, True),
+                                               (recurrence.OCCURRENCES_CACHE_MAX_OCCURRENCES, False)])
+def test_only_rules_with_few_occurrences_are_memoized(days, is_memoized):
+    start_date = datetime(2019, 1, 1)
+    rule = {'recurrence': constants.RecurrenceType.DAILY.value, 'occurrence_type': constants.OccurrenceType.ON.value,
+            'on_end_date': start_date + timedelta(days=days)}
+    recurrence.get_rule_occurrences.cache_clear()
+
+    occurrences = get_occurrences(start_date, start_date, rule)
+
+    assert len(occurrences) == days + 1
+    assert recurrence.get_rule_occurrences.cache_info().currsize == int(is_memoized)
+
+
+@pytest.mark.parametrize('separation_count', [0, -1])
+def test_schema_rejects_separation_count_below_one(separation_count):
+    with pytest.raises(ValidationError):
+        RecurrenceDetails().load({'recurrence': constants.RecurrenceType.MONTHLY.value, 'day_of_week': 2,
+                                  'week_of_month': 1, 'separation_count': separation_count})
+
+
+@settings(deadline=None)
+@given(start_dates, durations, st.integers(-3, 0), st.sampled_from([item.value for item in constants.OccurrenceType]))
+def test_rule_not_moving_forward_is_bounded(start_date, duration, separation_count, occurrence_type):
+    rule = {'recurrence': constants.RecurrenceType.MONTHLY.value, 'occurrence_type': occurrence_type,
+            'num_recurrences': constants.MAX_RECURRENCE, 'on_end_date': start_date + timedelta(days=365),
+            'day_of_week': 2, 'week_of_month': 1, 'separation_count': separation_count}
+    end_date = start_date + duration
+
+    assert len(list(islice(iter_occurrence_dates(start_date, end_date, rule), 3))) <= 1
+
+    with pytest.raises(ValueError):
+        get_interval_period(rule)
+    with pytest.raises(ValueError):
+        get_first_index_in_range(start_date, end_date, rule, end_date + timedelta(days=400))
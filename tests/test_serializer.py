@@ -0,0 +1,115 @@
+"""
+The fast serializers must dump the same output as the schemas they are compiled from
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.db.events.model import EventModel, OccurrenceDetail
+from core.db.model import to_primitive
+from core.db.organizations.model import OrganizationModel
+from services.events.occurrences import get_recurring_event
+from services.events.resource import event_list_schema, event_list_serializer, event_occurrence_details_schema, \
+    event_occurrence_details_serializer
+from services.guest.resource import organization_list_schema, organization_list_serializer
+from services.organizations.resource import organization_schema, organization_serializer
+
+START_DATE = datetime(2019, 10, 7)
+
+
+def make_event(index, **attributes):
+    start_date = START_DATE + timedelta(days=index)
+    occurrences = [OccurrenceDetail(occurrence_num=num + 1, start_date=start_date + timedelta(weeks=num),
+                                    end_date=start_date + timedelta(weeks=num)) for num in range(3)]
+    event_attributes = dict(
+        owner_name='Organization',
+        name='Event {}'.format(index),
+        description='Description of event {}'.format(index),
+        contact_email='contact{}@example.com'.format(index),
+        categories=['arts', 'sports'],
+        start_date=start_date,
+        end_date=occurrences[-1].end_date,
+        start_time=datetime(1900, 1, 1, 18, 30),
+        end_time=datetime(1900, 1, 1, 20, 0),
+        location='{} Queen Street'.format(index),
+        is_recurring=True,
+        recurrence_details={'recurrence': 'WEEKLY', 'occurrence_type': 'AFTER', 'num_recurrences': 3},
+        occurrences=occurrences,
+        updated_at=datetime(2019, 10, 1),
+    )
+    event_attributes.update(attributes)
+
+    return EventModel('event-{}'.format(index), 'organization', **event_attributes)
+
+
+def make_organization(index, **attributes):
+    organization_attributes = dict(
+        name='Organization {}'.format(index),
+        search_name='organization {}'.format(index),
+        email='organization{}@example.com'.format(index),
+        phone='506-555-{:04d}'.format(index),
+        administrator_id='user-{}'.format(index),
+        address={'street': '{} King Street'.format(index), 'city': 'Fredericton'},
+        is_verified=index % 2 == 0,
+    )
+    organization_attributes.update(attributes)
+
+    return OrganizationModel('organization-{}'.format(index), **organization_attributes)
+
+
+def get_occurrences(events):
+    return [get_recurring_event(event, occurrence) for event in events for occurrence in event.occurrences]
+
+
+def get_events():
+    return [
+        make_event(0),
+        # Unset optional attributes
+        make_event(1, description=None, recurrence_details=None, categories=[]),
+        make_event(2, is_recurring=False, recurrence_details=None),
+        # Missing attributes
+        EventModel('event-3', 'organization', name='Event 3', occurrences=[]),
+    ]
+
+
+@pytest.mark.parametrize('schema, serializer, get_objects', [
+    (event_list_schema, event_list_serializer, lambda: get_occurrences(get_events())),
+    (event_list_schema, event_list_serializer, lambda: get_events()[0].occurrences),
+    (event_list_schema, event_list_serializer, get_events),
+    (event_occurrence_details_schema, event_occurrence_details_serializer,
+     lambda: get_occurrences(get_events())),
+    (event_occurrence_details_schema, event_occurrence_details_serializer, get_events),
+    (organization_schema, organization_serializer,
+     lambda: [make_organization(0), make_organization(1, phone=None, is_verified=None),
+              OrganizationModel('organization-2', name='Organization 2')]),
+    (organization_list_schema, organization_list_serializer,
+     lambda: [make_organization(0), make_organization(1, address=None)]),
+])
+def test_dump_matches_schema(schema, serializer, get_objects):
+    objects = get_objects()
+    expected = schema.dump(objects, many=True)
+
+    assert serializer.dump(objects, many=True) == expected
+    assert [serializer.dump(obj) for obj in objects] == expected
+
+
+def test_dump_created_occurrences_matches_schema():
+    # The occurrences of a freshly created event are plain dicts
+    occurrences = [occurrence.attribute_values for occurrence in make_event(0).occurrences]
+
+    assert event_list_serializer.dump(occurrences, many=True) == event_list_schema.dump(occurrences, many=True)
+
+
+def test_dump_none():
+    assert event_list_serializer.dump(None) == event_list_schema.dump(None)
+    assert organization_serializer.dump(None) == organization_schema.dump(None)
+
+
+def test_encode_occurrence_with_its_own_dates():
+    event = make_event(0)
+    occurrence = get_recurring_event(event, event.occurrences[1])
+    encoded = to_primitive(occurrence)
+
+    assert (encoded['occurrence_num'], encoded['start_date'], encoded['end_date']) == \
+        (2, occurrence.start_date.isoformat(), occurrence.end_date.isoformat())
+    assert encoded['name'] == event.name